@@ -0,0 +1,249 @@
+"""Routes used by staff: order status changes, the kitchen prep list and the admin dashboard.
+
+The CSV and NDJSON exports import order_export when first requested.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pymongo import ReturnDocument
+
+import services
+from api_common import MAX_ORDER_PAGE_SIZE, admit_write, list_orders
+from models import (
+    ADMIN_STATS, ORDER, ORDER_LIST, ORDER_PROJECTION, STATUS_RESULTS, AdminStats, BulkStatusChange, Order,
+    PrepListResponse, StatusChange, StatusChangeResult,
+)
+from order_status import CANCELLED, conflict_detail, transition_filter, transition_update
+from pagination import ORDER_SORT
+from prep_list import parse_window
+from responses import TypedJSONResponse
+from slots import SlotError
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/prep", response_model=PrepListResponse)
+async def get_prep_list(day: date = Query(..., alias="date"), window: Optional[str] = None):
+    """Item quantities to prepare for pickups on a day, or in window=HH:MM-HH:MM of it
+
+    The window covers the pickup slots starting inside it.
+    """
+    try:
+        start, end = parse_window(day, window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start": start, "end": end, "items": await services.prep_list.window(start, end)}
+
+
+async def after_status_change(orders: List[dict]):
+    """Follow-up for orders whose status this request changed
+
+    Cancelled orders leave the sales rollups, prep counts and cached revenue
+    buckets and free their pickup slot.
+    """
+    pickup_slots = services.pickup_slots
+    cancelled = [order for order in orders if order["status"] == CANCELLED]
+    if cancelled:
+        await services.record_counters(cancelled, sign=-1)
+        order_dates = [order["order_date"] for order in cancelled]
+        await services.revenue_series.evict(order_dates)
+        await services.invalidation_bus.publish("revenue", order_dates=order_dates)
+        for order in cancelled:
+            try:
+                await pickup_slots.release(pickup_slots.slot_for(order["pickup_time"]))
+            except SlotError:
+                pass  # placed before pickup slots, so nothing was reserved
+    if not services.settings.order_feed_change_stream:
+        for order in orders:
+            services.order_feed.publish_status(order, order["status"])
+
+
+async def apply_transition(order_id: str, status: str, now: datetime) -> Optional[dict]:
+    """The order after moving it to ``status``, or None if it does not exist or may not move there"""
+    return await services.db.orders.find_one_and_update(
+        transition_filter(order_id, status),
+        transition_update(status, now),
+        projection=ORDER_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+@router.patch("/orders/{order_id}/status", response_model=Order, dependencies=[Depends(admit_write)])
+async def change_order_status(order_id: str, change: StatusChange):
+    """Move an order to the next status (pending -> preparing -> ready -> picked_up, or cancelled)"""
+    order = await apply_transition(order_id, change.status, datetime.utcnow())
+    if order is None:
+        current = await services.db.orders.find_one({"id": order_id}, {"_id": 0, "status": 1})
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        raise HTTPException(status_code=409, detail=conflict_detail(current["status"], change.status))
+    await after_status_change([order])
+    return TypedJSONResponse(ORDER.validate_python(order), ORDER)
+
+
+@router.patch("/orders/status", response_model=List[StatusChangeResult], dependencies=[Depends(admit_write)])
+async def change_order_statuses(batch: BulkStatusChange):
+    """Advance many orders at once, e.g. a whole pickup window to "ready"
+
+    Each change is applied only if it is a valid transition from the order's
+    current status; the rest are reported as "conflict" or "not_found". The
+    guarded updates run concurrently and each one returns the order it
+    changed, so concurrent bulk requests cannot claim each other's changes.
+    """
+    changes = list({change.id: change.status for change in batch.changes}.items())
+    now = datetime.utcnow()
+    applied = await asyncio.gather(*(apply_transition(order_id, status, now) for order_id, status in changes))
+
+    refused = [order_id for (order_id, _), order in zip(changes, applied) if order is None]
+    current = {}
+    if refused:
+        current = {
+            order["id"]: order["status"]
+            async for order in services.db.orders.find({"id": {"$in": refused}}, {"_id": 0, "id": 1, "status": 1})
+        }
+    updated = []
+    results = []
+    for (order_id, status), order in zip(changes, applied):
+        if order is not None:
+            updated.append(order)
+            results.append(StatusChangeResult(id=order_id, result="updated", status=status))
+        elif order_id not in current:
+            results.append(StatusChangeResult(id=order_id, result="not_found", detail="Order not found"))
+        else:
+            results.append(StatusChangeResult(
+                id=order_id, result="conflict", status=current[order_id],
+                detail=conflict_detail(current[order_id], status),
+            ))
+    await after_status_change(updated)
+    return TypedJSONResponse(results, STATUS_RESULTS)
+
+
+@router.get("/admin/orders", response_model=List[Order])
+async def get_all_orders_admin(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ORDER_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Admin endpoint to page through all orders with full details (may lag slightly; see reporting_db)"""
+    return await list_orders(cursor, limit, fields, source=services.reporting_db)
+
+
+@router.get("/admin/orders/feed")
+async def stream_new_orders():
+    """Server-sent events for each new order and the stats delta it causes"""
+    return StreamingResponse(
+        services.order_feed.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/admin/orders/export")
+async def export_orders_csv(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    fields: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Stream orders as a CSV file, optionally filtered to from <= order_date < to"""
+    from order_export import accepts_gzip, build_query, select_columns, stream_orders_csv
+
+    try:
+        columns = select_columns(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    compress = accepts_gzip(accept_encoding)
+    headers = {"Content-Disposition": "attachment; filename=bakery_orders.csv", "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+
+    # Return as downloadable file
+    return StreamingResponse(
+        stream_orders_csv(services.reporting_db.orders, build_query(date_from, date_to), columns, compress=compress),
+        media_type="text/csv",
+        headers=headers
+    )
+
+
+def encode_order_line(order: dict) -> bytes:
+    return ORDER.dump_json(ORDER.validate_python(order))
+
+
+@router.get("/admin/orders/changes")
+async def export_order_changes(since: Optional[datetime] = None):
+    """Stream orders created or updated since a watermark as NDJSON
+
+    The next watermark is returned in the X-Next-Watermark header before the
+    body; pass it back as ?since= on the next sync. Without since, every
+    order is exported.
+    """
+    from order_export import as_utc, changes_query, stream_orders_ndjson
+
+    since = as_utc(since)
+    # Writes stamped shortly before the window closes may not be visible
+    # yet, so it closes ORDER_CHANGES_SETTLE_SECONDS behind the clock
+    until = datetime.utcnow() - timedelta(seconds=services.settings.order_changes_settle)
+    if since is not None and since > until:
+        until = since  # never hand back an earlier watermark than was passed in
+    # On the primary: a lagging secondary would miss writes that the
+    # watermark then moves past for good
+    return StreamingResponse(
+        stream_orders_ndjson(services.db.orders, changes_query(since, until), encode_order_line),
+        media_type="application/x-ndjson",
+        headers={"X-Next-Watermark": until.isoformat()},
+    )
+
+
+async def compute_admin_stats():
+    """Dashboard statistics in two concurrent round-trips
+
+    Totals and today's counters come from the sales rollups, the recent
+    orders from the (order_date, id) index. Days are UTC, like order_date.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    (totals, today_counters), recent_orders = await asyncio.gather(
+        services.reporting_rollups.snapshot(today),
+        services.reporting_db.orders.find({}, ORDER_PROJECTION).sort(ORDER_SORT).limit(5).to_list(5),
+    )
+    if totals is None:
+        return await compute_admin_stats_from_orders(today, recent_orders)
+
+    return AdminStats(
+        total_orders=totals["orders"],
+        today_orders=today_counters["orders"] if today_counters else 0,
+        today_revenue=today_counters["revenue"] if today_counters else 0,
+        recent_orders=ORDER_LIST.validate_python(recent_orders),
+    )
+
+
+async def compute_admin_stats_from_orders(today: datetime, recent_orders: List[dict]):
+    """Dashboard statistics from one $facet aggregation over orders, for when rollups are missing"""
+    pipeline = [
+        {"$match": {"status": {"$ne": CANCELLED}}},
+        {"$facet": {
+            "total": [{"$count": "orders"}],
+            "today": [
+                {"$match": {"order_date": {"$gte": today}}},
+                {"$group": {"_id": None, "orders": {"$sum": 1}, "revenue": {"$sum": "$total_amount"}}}
+            ],
+        }}
+    ]
+    result = (await services.reporting_db.orders.aggregate(pipeline).to_list(1))[0]
+    total = result["total"][0]["orders"] if result["total"] else 0
+    today_counters = result["today"][0] if result["today"] else {"orders": 0, "revenue": 0}
+    return AdminStats(
+        total_orders=total,
+        today_orders=today_counters["orders"],
+        today_revenue=today_counters["revenue"],
+        recent_orders=ORDER_LIST.validate_python(recent_orders),
+    )
+
+
+@router.get("/admin/stats", response_model=AdminStats)
+async def get_admin_stats():
+    """Get admin dashboard statistics"""
+    return TypedJSONResponse(await services.admin_stats_cache.get("stats", compute_admin_stats), ADMIN_STATS)
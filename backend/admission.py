@@ -0,0 +1,135 @@
+"""Admission control and load shedding for the write endpoints.
+
+At opening time orders arrive in bursts, and letting every one of them
+reach MongoDB at once only makes all of them slow. Writes pass two gates
+before their handler runs:
+
+- a token bucket per client: ``rate`` requests per second with bursts of
+  up to ``burst``. A client over its rate is refused with 429 at once.
+  Off unless ``rate`` is set, since clients behind one proxy share an
+  address unless the app trusts X-Forwarded-For (see ``client_key``).
+- a limit of ``limit`` writes in flight per worker, with a short queue of
+  ``queue_size`` requests waiting at most ``queue_timeout`` seconds for a
+  slot. A full queue or an expired wait is refused with 503.
+
+Refusals carry a ``Retry-After`` so clients back off rather than retry
+immediately, and cost no database work. Limits, like the metrics, are per
+worker process.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+from metrics import Counter, Gauge, registry
+
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "admission_in_flight", "Write requests holding an admission slot.",
+))
+ADMISSION_QUEUE_DEPTH = registry.register(Gauge(
+    "admission_queue_depth", "Write requests waiting for an admission slot.",
+))
+ADMISSION_SHED = registry.register(Counter(
+    "admission_shed_total", "Write requests refused by admission control.", ("reason",),
+))
+
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+class Rejected(Exception):
+    """A request refused before reaching its handler"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))  # Retry-After takes whole seconds
+
+
+class TokenBuckets:
+    """One token bucket per client key, for the ``max_clients`` most recently seen clients"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token for ``key``; returns 0, or the seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            # The least recently seen client; its bucket has most likely refilled anyway
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore.locked():
+            if self.queued >= self.queue_size:
+                ADMISSION_SHED.inc((QUEUE_FULL,))
+                raise Rejected(503, QUEUE_FULL, self.queue_timeout)
+            self.queued += 1
+            ADMISSION_QUEUE_DEPTH.inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                ADMISSION_SHED.inc((QUEUE_TIMEOUT,))
+                raise Rejected(503, QUEUE_TIMEOUT, self.queue_timeout)
+            finally:
+                self.queued -= 1
+                ADMISSION_QUEUE_DEPTH.dec()
+        else:
+            await self._semaphore.acquire()
+        ADMISSION_IN_FLIGHT.inc()
+        try:
+            yield
+        finally:
+            ADMISSION_IN_FLIGHT.dec()
+            self._semaphore.release()
+
+
+class AdmissionControl:
+    def __init__(
+        self,
+        limit: int = 32,
+        queue_size: int = 64,
+        queue_timeout: float = 2.0,
+        rate: float = 0.0,
+        burst: float = 20.0,
+    ):
+        self.buckets = TokenBuckets(rate, burst)
+        self.limiter = ConcurrencyLimiter(limit, queue_size, queue_timeout)
+
+    @asynccontextmanager
+    async def admit(self, client: str) -> AsyncIterator[None]:
+        """Hold an admission slot for ``client``'s request; raises ``Rejected`` when shed"""
+        wait = self.buckets.take(client)
+        if wait:
+            ADMISSION_SHED.inc((RATE_LIMITED,))
+            raise Rejected(429, RATE_LIMITED, wait)
+        async with self.limiter.slot():
+            yield
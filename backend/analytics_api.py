@@ -0,0 +1,128 @@
+"""Routes for sales analytics, revenue series and demand forecasts.
+
+forecast.py (and with it pandas and numpy) is imported by the first
+forecast run, not at startup.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+import services
+from models import Forecast, RevenueSeriesResponse
+from order_status import CANCELLED
+from revenue import STEPS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/analytics")
+async def get_analytics():
+    """Get basic analytics from the precomputed sales rollups"""
+    totals = await services.reporting_rollups.totals()
+    if totals is None:
+        logger.warning("Sales rollups not built yet; run `python manage.py rebuild-rollups`")
+        return await compute_analytics_from_orders()
+
+    popular_items = await services.reporting_rollups.popular_items(5)
+    return {
+        "total_orders": totals["orders"],
+        "popular_items": [{"_id": item["name"], "count": item["quantity"]} for item in popular_items],
+        "total_revenue": totals["revenue"]
+    }
+
+
+# Default span of a revenue series when from= is not given
+REVENUE_SPANS = {"hour": timedelta(hours=24), "day": timedelta(days=30), "week": timedelta(weeks=12)}
+MAX_REVENUE_BUCKETS = 2000
+
+
+@router.get("/analytics/revenue", response_model=RevenueSeriesResponse)
+async def get_revenue_series(
+    bucket: Literal["hour", "day", "week"] = "day",
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+):
+    """Orders and revenue per hour, day or week (UTC) for from <= order_date < to
+
+    Defaults to the last 24 hours, 30 days or 12 weeks up to now.
+    """
+    from order_export import as_utc
+
+    end = as_utc(date_to) or datetime.utcnow()
+    start = as_utc(date_from) or end - REVENUE_SPANS[bucket]
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    if (end - start) / STEPS[bucket] > MAX_REVENUE_BUCKETS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_REVENUE_BUCKETS} buckets per request; use a larger bucket"
+        )
+    return {"bucket": bucket, "buckets": await services.revenue_series.series(bucket, start, end)}
+
+
+async def compute_analytics_from_orders():
+    """Analytics straight from the orders collection (full scan)"""
+    orders = services.reporting_db.orders
+    sold = {"status": {"$ne": CANCELLED}}
+    total_orders = await orders.count_documents(sold)
+
+    # Get popular items
+    pipeline = [
+        {"$match": sold},
+        {"$unwind": "$items"},
+        {"$group": {"_id": "$items.name", "count": {"$sum": "$items.quantity"}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 5}
+    ]
+    popular_items = await orders.aggregate(pipeline).to_list(5)
+
+    # Calculate revenue
+    revenue_pipeline = [
+        {"$match": sold},
+        {"$group": {"_id": None, "total_revenue": {"$sum": "$total_amount"}}}
+    ]
+    revenue_result = await orders.aggregate(revenue_pipeline).to_list(1)
+    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
+
+    return {
+        "total_orders": total_orders,
+        "popular_items": popular_items,
+        "total_revenue": total_revenue
+    }
+
+
+# At most one forecast job per worker; see forecast.py
+forecast_job: Optional[asyncio.Task] = None
+
+
+async def run_forecast_job(weeks: int, half_life: float):
+    # pandas is slow to import, so it is only loaded once a forecast is requested
+    from forecast import run_forecast
+    try:
+        await run_forecast(services.db, weeks=weeks, half_life=half_life, source=services.reporting_db)
+    except Exception:
+        logger.exception("Forecast job failed")
+
+
+@router.post("/admin/forecasts", status_code=202)
+async def start_forecast(
+    weeks: int = Query(52, ge=1, le=520),
+    half_life: float = Query(8.0, gt=0),
+):
+    """Recompute demand forecasts from order history in the background"""
+    global forecast_job
+    if forecast_job is not None and not forecast_job.done():
+        return {"status": "running"}
+    forecast_job = asyncio.create_task(run_forecast_job(weeks, half_life))
+    return {"status": "started"}
+
+
+@router.get("/admin/forecasts", response_model=List[Forecast])
+async def get_forecasts(item: Optional[str] = None):
+    """Expected quantity per item for each weekday and hour, from the last forecast run"""
+    query = {"item": item} if item else {}
+    return await services.reporting_db.forecasts.find(query, {"_id": 0}).sort("item", 1).to_list(None)
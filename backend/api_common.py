@@ -0,0 +1,72 @@
+"""Helpers shared by the storefront and staff routers: paged order lists and write admission."""
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+import services
+from admission import Rejected
+from models import ORDER_LIST, ORDER_PROJECTION, Order
+from pagination import InvalidCursor, fetch_page
+from responses import DOCUMENT_LIST, TypedJSONResponse
+
+# Order lists are paged newest first (ORDER_PAGE_SIZE per page); the next
+# page's token is returned in the X-Next-Cursor header and passed back as ?cursor=
+MAX_ORDER_PAGE_SIZE = 1000
+
+
+def order_projection(fields: Optional[str]) -> Optional[dict]:
+    """Mongo projection for a comma separated ``fields=`` list of Order fields"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in Order.model_fields]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown order fields: {', '.join(unknown) or fields}. Available: {', '.join(Order.model_fields)}"
+        )
+    return {"_id": 0, **{name: 1 for name in names}}
+
+
+async def list_orders(
+    cursor: Optional[str], limit: Optional[int], fields: Optional[str], source=None
+) -> TypedJSONResponse:
+    """One page of orders (from ``source``, the primary by default), as full Order objects or only the requested fields"""
+    projection = order_projection(fields)
+    try:
+        orders, next_cursor = await fetch_page(
+            (source if source is not None else services.db).orders,
+            limit or services.settings.order_page_size,
+            cursor,
+            projection or ORDER_PROJECTION,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    if projection is not None:
+        return TypedJSONResponse(orders, DOCUMENT_LIST, headers=headers)
+    return TypedJSONResponse(ORDER_LIST.validate_python(orders), ORDER_LIST, headers=headers)
+
+
+def client_key(request: Request) -> str:
+    """Who a request is rate limited as
+
+    With TRUST_FORWARDED_FOR, the last X-Forwarded-For address: the one our
+    proxy appended. Earlier ones come from the client and can be made up.
+    """
+    if services.settings.trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def admit_write(request: Request):
+    """Dependency holding an admission slot for the whole write; 429/503 with Retry-After when shed"""
+    try:
+        async with services.admission.admit(client_key(request)):
+            yield
+    except Rejected as e:
+        detail = "Too many requests; slow down" if e.status_code == 429 else "Busy; please retry shortly"
+        raise HTTPException(status_code=e.status_code, detail=detail, headers={"Retry-After": str(e.retry_after)})
@@ -0,0 +1,141 @@
+"""Startup bootstrap: seed reference data and reconcile declared indexes.
+
+Runs once from the application lifespan instead of on every request.
+Indexes are declared in ``INDEXES``; at startup missing ones are created
+and any difference between the declaration and what the server actually
+has (changed options, undeclared indexes) is reported as drift. Drifted
+indexes are never dropped automatically, since rebuilding a unique index
+on a large collection is an operation somebody should decide to run.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    partial_filter: Optional[Dict[str, Any]] = field(default=None, hash=False)
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name, "unique": self.unique}
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return options
+
+
+INDEXES: List[IndexSpec] = [
+    # get_order looks orders up by their public id
+    IndexSpec("orders", (("id", ASCENDING),), "orders_id_unique", unique=True),
+    # batch submissions are deduplicated by their client-supplied key
+    IndexSpec(
+        "orders",
+        (("idempotency_key", ASCENDING),),
+        "orders_idempotency_key_unique",
+        unique=True,
+        partial_filter={"idempotency_key": {"$type": "string"}},
+    ),
+    # order lists page on (order_date, id); admin stats and the CSV export
+    # filter and sort on its order_date prefix
+    IndexSpec("orders", (("order_date", DESCENDING), ("id", DESCENDING)), "orders_order_date_id"),
+    # incremental change exports read updated_at windows
+    IndexSpec("orders", (("updated_at", ASCENDING), ("id", ASCENDING)), "orders_updated_at_id"),
+    IndexSpec("menu_items", (("category", ASCENDING),), "menu_items_category"),
+    # analytics read the top items and per-day counters from the rollups
+    IndexSpec("sales_rollups", (("kind", ASCENDING), ("quantity", DESCENDING)), "sales_rollups_kind_quantity"),
+    IndexSpec("sales_rollups", (("kind", ASCENDING), ("day", ASCENDING)), "sales_rollups_kind_day"),
+    # email outbox workers claim the oldest due message per status
+    IndexSpec(
+        "email_outbox",
+        (("status", ASCENDING), ("next_attempt_at", ASCENDING)),
+        "email_outbox_status_next_attempt",
+    ),
+]
+
+
+@dataclass
+class BootstrapReport:
+    seeded: int = 0
+    created: List[str] = field(default_factory=list)
+    drift: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+
+async def seed_menu(db, items: List[dict]) -> int:
+    """Insert the sample menu if ``menu_items`` is empty; returns items added.
+
+    Items are upserted by name so that several workers starting at the same
+    time converge on one copy of the menu.
+    """
+    if await db.menu_items.count_documents({}, limit=1):
+        return 0
+    seeded = 0
+    for item in items:
+        result = await db.menu_items.update_one(
+            {"name": item["name"]}, {"$setOnInsert": item}, upsert=True
+        )
+        if result.upserted_id is not None:
+            seeded += 1
+    return seeded
+
+
+async def reconcile_indexes(db, specs: List[IndexSpec], report: BootstrapReport) -> None:
+    """Create missing indexes and record drift against ``specs`` in ``report``."""
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    for collection_name, declared in by_collection.items():
+        collection = db[collection_name]
+        existing = {}
+        async for index in collection.list_indexes():
+            existing[tuple(index["key"].items())] = index
+
+        for spec in declared:
+            index = existing.pop(spec.keys, None)
+            if index is None:
+                try:
+                    await collection.create_index(list(spec.keys), **spec.options())
+                    report.created.append(f"{collection_name}.{spec.name}")
+                except OperationFailure as e:
+                    report.failed.append(f"{collection_name}.{spec.name}: {e}")
+                continue
+            unique = bool(index.get("unique", False))
+            partial_filter = index.get("partialFilterExpression")
+            if unique != spec.unique or index["name"] != spec.name or partial_filter != spec.partial_filter:
+                report.drift.append(
+                    f"{collection_name}.{index['name']} on {dict(spec.keys)} "
+                    f"(unique={unique}, partial={partial_filter}) differs from declared "
+                    f"{spec.name} (unique={spec.unique}, partial={spec.partial_filter})"
+                )
+
+        for keys, index in existing.items():
+            if index["name"] != "_id_":
+                report.drift.append(
+                    f"{collection_name}.{index['name']} on {dict(keys)} is not declared"
+                )
+
+
+async def bootstrap(db, menu_items: List[dict], specs: List[IndexSpec] = INDEXES) -> BootstrapReport:
+    """Seed the menu and reconcile indexes, logging a summary of what changed."""
+    report = BootstrapReport()
+    report.seeded = await seed_menu(db, menu_items)
+    await reconcile_indexes(db, specs, report)
+
+    if report.seeded:
+        logger.info("Seeded %d sample menu items", report.seeded)
+    for name in report.created:
+        logger.info("Created index %s", name)
+    for message in report.drift:
+        logger.warning("Index drift: %s", message)
+    for message in report.failed:
+        logger.error("Index creation failed: %s", message)
+    return report
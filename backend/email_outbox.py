@@ -0,0 +1,284 @@
+"""Durable email outbox drained by background workers over pooled SMTP.
+
+Request handlers only insert a document into the ``email_outbox``
+collection; the actual SMTP conversation happens in background tasks, so
+a slow or unreachable mail server never stalls the event loop.
+
+Each outbox document moves through ``pending -> sending -> sent`` and,
+after ``max_attempts`` failures, ends up ``dead`` for manual inspection.
+Claiming a document leases it by pushing ``next_attempt_at`` forward, so a
+document whose worker died mid-send becomes claimable again once the lease
+runs out. Everything is ordered by one ``(status, next_attempt_at)`` index.
+
+smtplib and the ``email`` package are imported on first send rather than
+with this module, which the server imports at startup.
+"""
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+if TYPE_CHECKING:
+    import smtplib
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+
+class EmailConfig(BaseModel):
+    smtp_server: str = "smtp.gmail.com"
+    smtp_port: int = 587
+    email: str = ""
+    password: str = ""
+    use_tls: bool = True
+    timeout: float = 30.0
+
+
+def build_message(sender: str, to: str, subject: str, text: str, html: str) -> str:
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = to
+    msg.attach(MIMEText(text, 'plain'))
+    msg.attach(MIMEText(html, 'html'))
+    return msg.as_string()
+
+
+class SMTPPool:
+    """A small pool of persistent SMTP connections.
+
+    smtplib is blocking, so every network call runs in a worker thread. At
+    most ``size`` connections exist; each one is logged in once and reused
+    until the server drops it or it has been idle longer than
+    ``max_idle`` seconds, when it is checked with NOOP before reuse.
+    """
+
+    def __init__(self, config: EmailConfig, size: int = 2, max_idle: float = 60.0):
+        self.config = config
+        self.size = size
+        self.max_idle = max_idle
+        self.connects = 0
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple["smtplib.SMTP", float]] = []
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+
+        conn = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port, timeout=self.config.timeout)
+        try:
+            if self.config.use_tls:
+                conn.starttls()
+            if self.config.password:
+                conn.login(self.config.email, self.config.password)
+        except Exception:
+            self._quit(conn)
+            raise
+        self.connects += 1
+        return conn
+
+    @staticmethod
+    def _quit(conn: "smtplib.SMTP") -> None:
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _checkout(self) -> Tuple[Optional["smtplib.SMTP"], bool]:
+        """Pop an idle connection; the flag says whether it needs a NOOP check"""
+        if not self._idle:
+            return None, False
+        conn, last_used = self._idle.pop()
+        return conn, time.monotonic() - last_used > self.max_idle
+
+    def _send_blocking(
+        self, conn: Optional["smtplib.SMTP"], stale: bool, to: str, message: str
+    ) -> Tuple[Optional["smtplib.SMTP"], Optional[Exception]]:
+        """Send on ``conn`` (or a new connection); returns the reusable connection and any error"""
+        import smtplib
+
+        try:
+            if conn is not None and stale:
+                try:
+                    conn.noop()
+                except (smtplib.SMTPException, OSError):
+                    self._quit(conn)
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+            try:
+                conn.sendmail(self.config.email, to, message)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed a reused connection between sends; retry once fresh.
+                conn = self._connect()
+                conn.sendmail(self.config.email, to, message)
+            return conn, None
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            # The server rejected this message but the session is still usable.
+            return conn, e
+        except Exception as e:
+            if conn is not None:
+                self._quit(conn)
+            return None, e
+
+    async def send(self, to: str, message: str) -> None:
+        async with self._slots:
+            conn, stale = self._checkout()
+            conn, error = await asyncio.to_thread(self._send_blocking, conn, stale, to, message)
+            if conn is not None:
+                self._idle.append((conn, time.monotonic()))
+            if error is not None:
+                raise error
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            await asyncio.to_thread(self._quit, conn)
+
+
+class EmailOutbox:
+    """Mongo-backed outbox plus the background workers that drain it."""
+
+    def __init__(
+        self,
+        collection,
+        pool: SMTPPool,
+        workers: int = 2,
+        max_attempts: int = 5,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+        lease: float = 300.0,
+        poll_interval: float = 5.0,
+    ):
+        self.collection = collection
+        self.pool = pool
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @staticmethod
+    def _document(to: str, subject: str, text: str, html: str, order_id: Optional[str], now: datetime) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "order_id": order_id,
+            "to": to,
+            "subject": subject,
+            "text": text,
+            "html": html,
+            "status": PENDING,
+            "attempts": 0,
+            "last_error": None,
+            "created_at": now,
+            "next_attempt_at": now,
+        }
+
+    async def enqueue(self, to: str, subject: str, text: str, html: str, order_id: Optional[str] = None) -> str:
+        doc = self._document(to, subject, text, html, order_id, datetime.utcnow())
+        await self.collection.insert_one(doc)
+        self._wakeup.set()
+        return doc["id"]
+
+    async def enqueue_many(self, emails: Iterable, order_ids: Iterable[Optional[str]]) -> List[str]:
+        """Queue rendered emails (anything with to/subject/text/html) in one insert"""
+        now = datetime.utcnow()
+        docs = [
+            self._document(email.to, email.subject, email.text, email.html, order_id, now)
+            for email, order_id in zip(emails, order_ids)
+        ]
+        if docs:
+            await self.collection.insert_many(docs)
+            self._wakeup.set()
+        return [doc["id"] for doc in docs]
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter, capped at ``max_delay``"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"status": {"$in": [PENDING, SENDING]}, "next_attempt_at": {"$lte": now}},
+            {
+                "$set": {"status": SENDING, "next_attempt_at": now + timedelta(seconds=self.lease)},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def deliver(self, doc: dict) -> bool:
+        """Send one claimed document and record the outcome"""
+        import smtplib
+
+        message = build_message(self.pool.config.email, doc["to"], doc["subject"], doc["text"], doc["html"])
+        try:
+            await self.pool.send(doc["to"], message)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            # A refused recipient will not be accepted on a later attempt either.
+            if isinstance(e, smtplib.SMTPRecipientsRefused) or doc["attempts"] >= self.max_attempts:
+                update = {"status": DEAD, "last_error": error}
+                logger.error("Email %s to %s is dead after %d attempts: %s", doc["id"], doc["to"], doc["attempts"], error)
+            else:
+                retry_at = datetime.utcnow() + timedelta(seconds=self.backoff(doc["attempts"]))
+                update = {"status": PENDING, "last_error": error, "next_attempt_at": retry_at}
+                logger.warning("Email %s to %s failed (attempt %d): %s", doc["id"], doc["to"], doc["attempts"], error)
+            await self.collection.update_one({"id": doc["id"]}, {"$set": update})
+            return False
+
+        await self.collection.update_one(
+            {"id": doc["id"]}, {"$set": {"status": SENT, "sent_at": datetime.utcnow(), "last_error": None}}
+        )
+        logger.info("Order confirmation email sent to %s", doc["to"])
+        return True
+
+    async def drain(self) -> int:
+        """Deliver every due document; returns how many were attempted"""
+        attempted = 0
+        while (doc := await self.claim()) is not None:
+            await self.deliver(doc)
+            attempted += 1
+        return attempted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox worker error")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.pool.close()
@@ -0,0 +1,154 @@
+"""Demand forecasts per menu item, weekday and hour of pickup.
+
+Order lines are streamed out of MongoDB already flattened by ``$unwind``,
+``chunk_size`` rows at a time. Each chunk becomes a small DataFrame whose
+columns are reduced with numpy into a dense ``items x 7 x 24`` array of
+weighted quantities, so memory depends on the chunk size and the number
+of menu items, never on how many years of orders are read.
+
+A forecast is the recency-weighted average quantity for each weekday and
+hour over the last ``weeks`` weeks: a week ``half_life`` weeks old counts
+half as much as the current one. Lines are placed at their pickup time,
+or at the order date for orders whose pickup time is not a date and time.
+Results replace the ``forecasts`` collection in one rename.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = 7
+HOURS = 24
+WEEK = pd.Timedelta(days=7)
+
+
+def order_lines_pipeline(since: datetime, until: datetime) -> List[Dict[str, Any]]:
+    return [
+        {"$match": {"order_date": {"$gte": since, "$lt": until}, "status": {"$ne": "cancelled"}}},
+        {"$project": {"_id": 0, "order_date": 1, "pickup_time": 1, "items.name": 1, "items.quantity": 1}},
+        {"$unwind": "$items"},
+        {"$project": {"d": "$order_date", "p": "$pickup_time", "n": "$items.name", "q": "$items.quantity"}},
+    ]
+
+
+class DemandAccumulator:
+    """Recency-weighted quantity sums per (item, weekday, hour)"""
+
+    def __init__(self, end: datetime, weeks: int = 52, half_life: float = 8.0):
+        self.end = pd.Timestamp(end)
+        self.weeks = weeks
+        self.decay = 0.5 ** (1 / half_life)
+        self.items: Dict[str, int] = {}
+        self.sums = np.zeros((0, WEEKDAYS, HOURS))
+        self.lines = 0
+
+    def _codes(self, names) -> np.ndarray:
+        codes, uniques = pd.factorize(names)
+        known = np.array([self.items.setdefault(name, len(self.items)) for name in uniques], dtype=np.int64)
+        if len(self.items) > self.sums.shape[0]:
+            grown = np.zeros((len(self.items), WEEKDAYS, HOURS))
+            grown[: self.sums.shape[0]] = self.sums
+            self.sums = grown
+        return known[codes]
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        """Fold one chunk of ``{"d", "p", "n", "q"}`` order lines into the sums"""
+        if not rows:
+            return
+        frame = pd.DataFrame.from_records(rows, columns=["d", "p", "n", "q"])
+        # Pickup times look like 2026-11-02T08:00[:ss]; anything else falls back to the order date
+        pickup = pd.to_datetime(frame["p"].astype("string").str.slice(0, 16), format="%Y-%m-%dT%H:%M", errors="coerce")
+        when = pickup.fillna(pd.to_datetime(frame["d"]))
+        age = ((self.end - when) // WEEK).to_numpy(dtype=np.float64, na_value=np.nan)
+        keep = (age >= 0) & (age < self.weeks)
+        if not keep.any():
+            return
+
+        items = self._codes(frame["n"].to_numpy()[keep])
+        weekday = when.dt.weekday.to_numpy()[keep]
+        hour = when.dt.hour.to_numpy()[keep]
+        weight = frame["q"].to_numpy(dtype=np.float64)[keep] * self.decay ** age[keep]
+        cells = (items * WEEKDAYS + weekday) * HOURS + hour
+        self.sums += np.bincount(cells, weights=weight, minlength=self.sums.size).reshape(self.sums.shape)
+        self.lines += int(keep.sum())
+
+    def forecast(self) -> np.ndarray:
+        """Expected quantity per (item, weekday, hour) in a coming week"""
+        return self.sums / (self.decay ** np.arange(self.weeks)).sum()
+
+
+@dataclass
+class ForecastRun:
+    generated_at: datetime
+    weeks: int
+    half_life: float
+    lines: int
+    items: int
+    seconds: float
+
+
+def forecast_documents(accumulator: DemandAccumulator, generated_at: datetime, half_life: float) -> List[Dict[str, Any]]:
+    expected = accumulator.forecast().round(2)
+    return [
+        {
+            "_id": name,
+            "item": name,
+            "generated_at": generated_at,
+            "history_weeks": accumulator.weeks,
+            "half_life_weeks": half_life,
+            "daily": expected[code].sum(axis=1).round(2).tolist(),  # Monday first
+            "hourly": expected[code].tolist(),  # [weekday][hour]
+        }
+        for name, code in accumulator.items.items()
+    ]
+
+
+async def run_forecast(
+    db, weeks: int = 52, half_life: float = 8.0, chunk_size: int = 5000, source=None
+) -> ForecastRun:
+    """Recompute every item's forecast from the last ``weeks`` weeks of orders
+
+    Orders are read from ``source`` (e.g. a secondary-preferred handle on
+    the same database) when given; forecasts are always written to ``db``.
+    """
+    started = datetime.utcnow()
+    end = started.replace(hour=0, minute=0, second=0, microsecond=0)
+    accumulator = DemandAccumulator(end, weeks, half_life)
+    # A day of slack: orders placed before the window may be picked up inside it
+    since = end - timedelta(weeks=weeks, days=1)
+
+    chunk: List[Dict[str, Any]] = []
+    orders = (source if source is not None else db).orders
+    async for row in orders.aggregate(order_lines_pipeline(since, end), batchSize=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            # numpy work runs off the event loop so the API stays responsive
+            await asyncio.to_thread(accumulator.add, chunk)
+            chunk = []
+    await asyncio.to_thread(accumulator.add, chunk)
+
+    scratch = db["forecasts_rebuild"]
+    await scratch.drop()
+    documents = forecast_documents(accumulator, started, half_life)
+    if documents:
+        await scratch.insert_many(documents)
+    else:
+        await db.create_collection(scratch.name)
+    await scratch.rename("forecasts", dropTarget=True)
+
+    run = ForecastRun(
+        generated_at=started,
+        weeks=weeks,
+        half_life=half_life,
+        lines=accumulator.lines,
+        items=len(documents),
+        seconds=(datetime.utcnow() - started).total_seconds(),
+    )
+    logger.info("Forecast %d items from %d order lines in %.1fs", run.items, run.lines, run.seconds)
+    return run
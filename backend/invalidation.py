@@ -0,0 +1,117 @@
+"""Cache invalidations shared between worker processes.
+
+Each uvicorn/gunicorn worker keeps its own in-process caches (menu bodies,
+the price and search indexes, closed revenue buckets). When one worker
+changes the data behind a cache it publishes a small message to the capped
+``cache_invalidations`` collection; every other worker follows the
+collection with a tailable cursor and drops its own copy. A capped
+collection works on a standalone server, unlike a change stream, and
+bounds itself: old messages are overwritten, never cleaned up.
+
+Messages are hints: a worker that misses one still reloads when its
+cache's TTL expires, and handling a message twice only costs a reload.
+Caches with TTLs of a few seconds do not use the bus.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+
+class InvalidationBus:
+    def __init__(self, db, collection: str = "cache_invalidations", size: int = 1 << 20, retry_delay: float = 1.0):
+        self.db = db
+        self.name = collection
+        self.size = size
+        self.retry_delay = retry_delay
+        self.origin = uuid.uuid4().hex  # this worker; its own messages are skipped
+        self._handlers: Dict[str, Handler] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Run ``handler(payload)`` for every ``topic`` message another worker publishes"""
+        self._handlers[topic] = handler
+
+    async def publish(self, topic: str, **payload: Any) -> None:
+        """Tell the other workers; failures are logged, the caches' TTLs still apply"""
+        if not self.running:
+            return
+        message = {"topic": topic, "origin": self.origin, "at": datetime.utcnow(), "payload": payload}
+        try:
+            await self.collection.insert_one(message)
+        except Exception:
+            logger.exception("Failed to publish %s invalidation", topic)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._follow())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _ensure_collection(self) -> None:
+        try:
+            await self.db.create_collection(self.name, capped=True, size=self.size)
+        except CollectionInvalid:
+            pass  # created by another worker
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        handler = self._handlers.get(message.get("topic"))
+        if handler is None:
+            return
+        try:
+            handler(message.get("payload") or {})
+        except Exception:
+            logger.exception("Failed to apply %s invalidation", message.get("topic"))
+
+    async def _follow(self) -> None:
+        # Messages from before this worker started concern caches it has not filled yet;
+        # the margin covers clock skew between hosts
+        since = datetime.utcnow() - timedelta(seconds=5)
+        seen_at_since = set()  # a reopened cursor starts at `since` again
+        created = False
+        while True:
+            try:
+                if not created:
+                    await self._ensure_collection()
+                    created = True
+                cursor = self.collection.find(
+                    {"at": {"$gte": since}, "origin": {"$ne": self.origin}},
+                    cursor_type=CursorType.TAILABLE_AWAIT,
+                )
+                while cursor.alive:
+                    async for message in cursor:
+                        if message["_id"] in seen_at_since:
+                            continue
+                        if message["at"] != since:
+                            since, seen_at_since = message["at"], set()
+                        seen_at_since.add(message["_id"])
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Invalidation bus cursor failed; reopening")
+            # A tailable cursor on an empty capped collection dies at once
+            await asyncio.sleep(self.retry_delay)
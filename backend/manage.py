@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the bakery backend.
+
+Run from backend/ with the same .env as the server:
+    python manage.py rebuild-rollups [--chunk-size 1000]
+    python manage.py rebuild-prep [--chunk-size 1000]
+    python manage.py forecast [--weeks 52] [--half-life 8] [--chunk-size 5000]
+"""
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from prep_list import PrepList
+from rollups import SalesRollups
+from settings import Settings
+from slots import PickupSlots
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+
+async def rebuild_rollups(db, args):
+    processed = await SalesRollups(db).rebuild(db.orders, chunk_size=args.chunk_size)
+    print(f"Rebuilt sales rollups from {processed} orders")
+
+
+async def rebuild_prep(db, args):
+    # Slots must be cut like the server's, so read the same setting
+    slots = PickupSlots(db.pickup_slots, minutes=Settings.from_env().pickup_slot_minutes)
+    processed = await PrepList(db, slots.slot_for).rebuild(db.orders, chunk_size=args.chunk_size)
+    print(f"Rebuilt prep counts from {processed} orders")
+
+
+async def forecast(db, args):
+    from forecast import run_forecast  # pandas is only needed here
+
+    run = await run_forecast(db, weeks=args.weeks, half_life=args.half_life, chunk_size=args.chunk_size)
+    print(f"Forecast {run.items} items from {run.lines} order lines in {run.seconds:.1f}s")
+
+
+async def run(args):
+    settings = Settings.from_env()
+    client = AsyncIOMotorClient(settings.mongo_url, **settings.motor_options())
+    try:
+        await args.handler(client[settings.db_name], args)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bakery backend maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute sales rollups from raw orders")
+    rebuild.add_argument("--chunk-size", type=int, default=1000)
+    rebuild.set_defaults(handler=rebuild_rollups)
+
+    prep = commands.add_parser("rebuild-prep", help="Recompute kitchen prep counts from raw orders")
+    prep.add_argument("--chunk-size", type=int, default=1000)
+    prep.set_defaults(handler=rebuild_prep)
+
+    demand = commands.add_parser("forecast", help="Recompute per-item demand forecasts from order history")
+    demand.add_argument("--weeks", type=int, default=52, help="weeks of history to use")
+    demand.add_argument("--half-life", type=float, default=8.0, help="weeks until history counts half")
+    demand.add_argument("--chunk-size", type=int, default=5000)
+    demand.set_defaults(handler=forecast)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
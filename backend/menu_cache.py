@@ -0,0 +1,119 @@
+"""In-process cache of serialized menu responses.
+
+The menu changes rarely but is requested on every page load and service
+worker refresh. Entries hold the final JSON body together with a strong
+ETag, so a hit costs a dict lookup and a conditional request costs nothing
+but headers.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Response
+
+MenuLoader = Callable[[Optional[str]], Awaitable[List[dict]]]
+
+
+@dataclass(frozen=True)
+class MenuCacheEntry:
+    body: bytes
+    etag: str
+    version: int
+    loaded_at: float
+
+
+def serialize_menu(items: List[dict]) -> bytes:
+    """Encode menu items exactly like FastAPI's default JSONResponse."""
+    return json.dumps(
+        items, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class MenuCache:
+    """Versioned cache of menu bodies keyed by category (``None`` = full menu).
+
+    ``invalidate()`` bumps the version and drops every entry; loads that were
+    in flight when the version changed are not stored. A ``ttl`` bounds how
+    long edits made outside this process can go unnoticed, and ``ttl=0``
+    disables caching altogether. Category is a free-form path segment, so at
+    most ``max_entries`` keys are kept.
+    """
+
+    def __init__(self, loader: MenuLoader, ttl: float = 300.0, max_entries: int = 32):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._version = 0
+        self._entries: Dict[Optional[str], MenuCacheEntry] = {}
+        # Loads are rare, so a single lock is enough to stop a stampede.
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._entries.clear()
+
+    def _fresh(self, category: Optional[str]) -> Optional[MenuCacheEntry]:
+        entry = self._entries.get(category)
+        if entry is None or entry.version != self._version:
+            return None
+        if time.monotonic() - entry.loaded_at >= self.ttl:
+            return None
+        return entry
+
+    async def _load(self, category: Optional[str], version: int) -> MenuCacheEntry:
+        body = serialize_menu(await self._loader(category))
+        # The ETag is a content hash rather than the version number so that it
+        # stays valid across restarts and across workers.
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        return MenuCacheEntry(body=body, etag=etag, version=version, loaded_at=time.monotonic())
+
+    async def get(self, category: Optional[str] = None) -> MenuCacheEntry:
+        entry = self._fresh(category)
+        if entry is not None:
+            return entry
+        if self.ttl <= 0:
+            return await self._load(category, self._version)
+
+        async with self._lock:
+            # Another request may have filled the entry while we waited.
+            entry = self._fresh(category)
+            if entry is not None:
+                return entry
+            version = self._version
+            entry = await self._load(category, version)
+            if version == self._version and (
+                category in self._entries or len(self._entries) < self.max_entries
+            ):
+                self._entries[category] = entry
+            return entry
+
+    async def response(self, category: Optional[str], if_none_match: Optional[str]) -> Response:
+        """Build a 200 (or 304 when the client copy is current) for ``category``."""
+        entry = await self.get(category)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
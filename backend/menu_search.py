@@ -0,0 +1,211 @@
+"""Menu search from an in-memory inverted index.
+
+Every word of an item's name, ingredients and description is a posting
+``word -> {item id: weight}``; name words weigh most and description words
+least. The vocabulary is also kept sorted, so a query word matches every
+indexed word it is a prefix of with one ``bisect`` ("crois" finds
+"croissant") and searching as the customer types needs no ``$regex``
+scan. An item must match every query word; its score is the sum of its
+best weight per word, halved for prefix-only matches. Items marked
+unavailable stay indexed, as they usually come back, but are not returned.
+
+``MenuSearch`` follows ``MenuPriceIndex``: the menu is reloaded after
+``invalidate()`` or ``ttl`` seconds. A reload diffs the new menu against
+the indexed one and only re-indexes items that were added, changed or
+removed.
+"""
+import asyncio
+import bisect
+import re
+import time
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+NAME_WEIGHT = 3.0
+INGREDIENT_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_PENALTY = 0.5
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words with accents stripped ("Crème brûlée" -> creme, brulee)"""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    return WORD.findall("".join(char for char in folded if not unicodedata.combining(char)))
+
+
+def parse_terms(value: Optional[str]) -> List[List[str]]:
+    """Comma separated phrases, each as its words: ``"Tree nuts, egg"`` -> [[tree, nuts], [egg]]"""
+    if not value:
+        return []
+    return [words for words in (tokenize(part) for part in value.split(",")) if words]
+
+
+class InvertedIndex:
+    def __init__(self) -> None:
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self._unavailable: Set[str] = set()
+        self._signatures: Dict[str, Tuple] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._ingredients: Dict[str, Set[str]] = {}
+        self._words: List[str] = []  # sorted vocabulary of _postings
+        self._ingredient_words: List[str] = []  # sorted vocabulary of _ingredients
+
+    @staticmethod
+    def _signature(item: Dict[str, Any]) -> Tuple:
+        return (item["name"], item.get("description", ""), tuple(item.get("ingredients") or ()))
+
+    @staticmethod
+    def _weights(item: Dict[str, Any]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        fields = [(DESCRIPTION_WEIGHT, item.get("description", "")), (NAME_WEIGHT, item["name"])]
+        fields += [(INGREDIENT_WEIGHT, ingredient) for ingredient in item.get("ingredients") or ()]
+        for weight, text in fields:
+            for word in tokenize(text):
+                weights[word] = max(weights.get(word, 0.0), weight)
+        return weights
+
+    @staticmethod
+    def _ingredient_words_of(item: Dict[str, Any]) -> Set[str]:
+        return {word for ingredient in item.get("ingredients") or () for word in tokenize(ingredient)}
+
+    def update(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Make the index match ``items``; returns how many items were (re)indexed or dropped"""
+        incoming = {item["id"]: item for item in items}
+        changed = 0
+        for item_id in [item_id for item_id in self.items if item_id not in incoming]:
+            self._remove(item_id)
+            changed += 1
+        for item_id, item in incoming.items():
+            if self._signatures.get(item_id) == self._signature(item):
+                self._set_item(item)  # price or availability only: postings are unchanged
+                continue
+            if item_id in self.items:
+                self._remove(item_id)
+            self._add(item)
+            changed += 1
+        return changed
+
+    def _set_item(self, item: Dict[str, Any]) -> None:
+        self.items[item["id"]] = item
+        if item.get("available", True):
+            self._unavailable.discard(item["id"])
+        else:
+            self._unavailable.add(item["id"])
+
+    def _add(self, item: Dict[str, Any]) -> None:
+        item_id = item["id"]
+        self._set_item(item)
+        self._signatures[item_id] = self._signature(item)
+        for word, weight in self._weights(item).items():
+            if word not in self._postings:
+                self._postings[word] = {}
+                bisect.insort(self._words, word)
+            self._postings[word][item_id] = weight
+        for word in self._ingredient_words_of(item):
+            if word not in self._ingredients:
+                self._ingredients[word] = set()
+                bisect.insort(self._ingredient_words, word)
+            self._ingredients[word].add(item_id)
+
+    def _remove(self, item_id: str) -> None:
+        item = self.items.pop(item_id)
+        self._unavailable.discard(item_id)
+        del self._signatures[item_id]
+        for word in self._weights(item):
+            postings = self._postings[word]
+            del postings[item_id]
+            if not postings:
+                del self._postings[word]
+                self._words.pop(bisect.bisect_left(self._words, word))
+        for word in self._ingredient_words_of(item):
+            holders = self._ingredients[word]
+            holders.discard(item_id)
+            if not holders:
+                del self._ingredients[word]
+                self._ingredient_words.pop(bisect.bisect_left(self._ingredient_words, word))
+
+    @staticmethod
+    def _completions(vocabulary: List[str], prefix: str) -> List[str]:
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\x7f")  # past every word of [a-z0-9] starting with prefix
+        return vocabulary[start:end]
+
+    def _scores(self, word: str) -> Dict[str, float]:
+        """Best weight per item for ``word`` itself or any word it is a prefix of"""
+        scores: Dict[str, float] = {}
+        for candidate in self._completions(self._words, word):
+            factor = 1.0 if candidate == word else PREFIX_PENALTY
+            for item_id, weight in self._postings[candidate].items():
+                scores[item_id] = max(scores.get(item_id, 0.0), weight * factor)
+        return scores
+
+    def excluded(self, ingredients: List[List[str]]) -> Set[str]:
+        """Items with an ingredient matching any phrase ("egg" excludes items with "Eggs")"""
+        excluded: Set[str] = set()
+        for words in ingredients:
+            holders: Optional[Set[str]] = None
+            for word in words:
+                matches = set().union(*(
+                    self._ingredients[candidate] for candidate in self._completions(self._ingredient_words, word)
+                ))
+                holders = matches if holders is None else holders & matches
+            excluded |= holders or set()
+        return excluded
+
+    def search(self, query: Optional[str], exclude_ingredients: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matching available items first; every available item in menu order when ``query`` is empty"""
+        excluded = self.excluded(parse_terms(exclude_ingredients)) | self._unavailable
+        words = list(dict.fromkeys(tokenize(query or "")))
+        if not words:
+            return [item for item_id, item in self.items.items() if item_id not in excluded][:limit]
+
+        totals: Optional[Dict[str, float]] = None
+        for word in sorted(words, key=len, reverse=True):  # longest first: usually the fewest matches
+            scores = self._scores(word)
+            if totals is None:
+                totals = {item_id: score for item_id, score in scores.items() if item_id not in excluded}
+            else:
+                totals = {item_id: total + scores[item_id] for item_id, total in totals.items() if item_id in scores}
+            if not totals:
+                return []
+        ranked = sorted(totals.items(), key=lambda entry: (-entry[1], self.items[entry[0]]["name"]))
+        return [self.items[item_id] for item_id, _ in ranked[:limit]]
+
+
+class MenuSearch:
+    """An ``InvertedIndex`` of the menu, refreshed after ``invalidate()`` or ``ttl`` seconds"""
+
+    def __init__(self, loader: Callable[[], Awaitable[List[dict]]], ttl: float = 300.0):
+        self._loader = loader
+        self.ttl = ttl
+        self.index = InvertedIndex()
+        self._version = 0
+        self._loaded: Optional[Tuple[int, float]] = None  # (version, monotonic time) of the last load
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    def _fresh(self) -> bool:
+        if self._loaded is None:
+            return False
+        version, loaded_at = self._loaded
+        return version == self._version and time.monotonic() - loaded_at < self.ttl
+
+    async def refresh(self) -> InvertedIndex:
+        """The index, reloading the menu first if it is stale"""
+        if self._fresh():
+            return self.index
+        async with self._lock:
+            if not self._fresh():
+                version = self._version
+                self.index.update(await self._loader())
+                self._loaded = (version, time.monotonic())
+        return self.index
+
+    async def search(
+        self, query: Optional[str], exclude_ingredients: Optional[str] = None, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        return (await self.refresh()).search(query, exclude_ingredients, limit)
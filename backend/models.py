@@ -0,0 +1,150 @@
+"""Request and response models shared by the API routers."""
+import uuid
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+class MenuItem(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    description: str
+    price: float
+    category: str  # "bakery" or "cafe"
+    image: str
+    ingredients: Optional[List[str]] = []
+    available: bool = True
+
+
+class CartItem(BaseModel):
+    id: str
+    name: str
+    price: float
+    quantity: int
+    category: str
+
+
+class Order(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    customer_name: str
+    customer_email: str
+    customer_phone: str
+    items: List[CartItem]
+    total_amount: float
+    pickup_time: str
+    special_requests: Optional[str] = ""
+    order_date: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None  # order_date until the first status change
+    status: str = "pending"
+
+
+class OrderCreate(BaseModel):
+    customer_name: str
+    customer_email: str
+    customer_phone: str
+    items: List[CartItem]
+    total_amount: float
+    pickup_time: str
+    special_requests: Optional[str] = ""
+
+
+MAX_ORDER_BATCH = 100
+
+
+class BatchOrderCreate(OrderCreate):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+
+
+class OrderBatch(BaseModel):
+    orders: List[BatchOrderCreate] = Field(..., min_length=1, max_length=MAX_ORDER_BATCH)
+
+
+class BatchOrderResult(BaseModel):
+    idempotency_key: str
+    status: str  # "created", "duplicate" or "error"
+    order: Optional[Order] = None
+    detail: Optional[str] = None
+
+
+OrderStatus = Literal["pending", "preparing", "ready", "picked_up", "cancelled"]
+MAX_STATUS_BATCH = 500
+
+
+class StatusChange(BaseModel):
+    status: OrderStatus
+
+
+class OrderStatusChange(StatusChange):
+    id: str
+
+
+class BulkStatusChange(BaseModel):
+    changes: List[OrderStatusChange] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH)
+
+
+class StatusChangeResult(BaseModel):
+    id: str
+    result: str  # "updated", "conflict" or "not_found"
+    status: Optional[str] = None  # the order's status afterwards
+    detail: Optional[str] = None
+
+
+class PickupSlot(BaseModel):
+    start: datetime
+    end: datetime
+    capacity: int
+    reserved: int
+    remaining: int
+
+
+class PrepItem(BaseModel):
+    item_id: str
+    name: str
+    quantity: int
+
+
+class PrepListResponse(BaseModel):
+    start: datetime
+    end: datetime
+    items: List[PrepItem]
+
+
+class Forecast(BaseModel):
+    item: str
+    generated_at: datetime
+    history_weeks: int
+    half_life_weeks: float
+    daily: List[float]  # Monday first
+    hourly: List[List[float]]  # [weekday][hour]
+
+
+class RevenueBucket(BaseModel):
+    start: datetime
+    end: datetime
+    orders: int
+    revenue: float
+
+
+class RevenueSeriesResponse(BaseModel):
+    bucket: str
+    buckets: List[RevenueBucket]
+
+
+class AdminStats(BaseModel):
+    total_orders: int
+    today_orders: int
+    today_revenue: float
+    recent_orders: List[Order]
+
+
+# Handlers validate Mongo documents once through these adapters and return a
+# TypedJSONResponse, bypassing FastAPI's second response_model validation
+ORDER = TypeAdapter(Order)
+ORDER_LIST = TypeAdapter(List[Order])
+BATCH_RESULTS = TypeAdapter(List[BatchOrderResult])
+ADMIN_STATS = TypeAdapter(AdminStats)
+STATUS_RESULTS = TypeAdapter(List[StatusChangeResult])
+
+# Order fields without Mongo's _id
+ORDER_PROJECTION = {"_id": 0}
@@ -0,0 +1,47 @@
+"""Order confirmation emails, queued in the outbox (see email_outbox.py).
+
+The templates are compiled on first use and smtplib is only loaded by the
+outbox workers, so a worker without SMTP settings never loads either.
+
+The orders are already stored when their emails are queued, so a failure
+to render or queue one is logged rather than failing the request; a
+client retrying after an error would place the order again.
+"""
+import logging
+from typing import List
+
+import services
+from models import Order
+
+logger = logging.getLogger(__name__)
+
+
+async def send_order_confirmation_email(order: Order):
+    """Queue the order confirmation email for the background email workers"""
+    if not services.EMAIL_CONFIG.email:
+        logger.info("Email configuration not set. Skipping email send.")
+        return False
+
+    try:
+        from email_templates import confirmation_templates
+        email = confirmation_templates.render(order)
+        await services.email_outbox.enqueue(email.to, email.subject, email.text, email.html, order_id=order.id)
+    except Exception:
+        logger.exception("Failed to queue the confirmation email for order %s", order.id)
+        return False
+    return True
+
+
+async def send_order_confirmation_emails(orders: List[Order]):
+    """Queue confirmation emails for many orders with one insert"""
+    if not services.EMAIL_CONFIG.email or not orders:
+        return False
+
+    try:
+        from email_templates import confirmation_templates
+        emails = confirmation_templates.render_many(orders)
+        await services.email_outbox.enqueue_many(emails, [order.id for order in orders])
+    except Exception:
+        logger.exception("Failed to queue confirmation emails for %d orders", len(orders))
+        return False
+    return True
@@ -0,0 +1,150 @@
+"""Streaming CSV export of orders, and incremental NDJSON change exports.
+
+Rows are read from the Motor cursor in batches and each batch is encoded
+(and optionally gzip-compressed) into one chunk before it is yielded, so
+peak memory depends on the batch size and not on how many orders exist.
+
+Change exports cover the half-open window ``since <= updated_at < until``
+on the (updated_at, id) index. ``until`` becomes the caller's next
+watermark, so consecutive exports neither skip nor repeat an order
+however many share a timestamp. ``until`` trails the clock by a few
+seconds so that writes stamped just before it, but not yet visible to
+the query, land in the next window instead of being missed.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+
+class ExportColumn(NamedTuple):
+    header: str
+    source: Sequence[str]  # order fields the column reads, for the projection
+    value: Callable[[Dict[str, Any]], Any]
+
+
+def _items(order: Dict[str, Any]) -> str:
+    return "; ".join(f"{item['name']} x{item['quantity']}" for item in order.get('items', []))
+
+
+EXPORT_COLUMNS: Dict[str, ExportColumn] = {
+    "id": ExportColumn('Order ID', ("id",), lambda o: o['id'][:8]),
+    "date": ExportColumn('Date', ("order_date",), lambda o: o['order_date'].strftime('%Y-%m-%d %H:%M')),
+    "customer_name": ExportColumn('Customer Name', ("customer_name",), lambda o: o['customer_name']),
+    "email": ExportColumn('Email', ("customer_email",), lambda o: o['customer_email']),
+    "phone": ExportColumn('Phone', ("customer_phone",), lambda o: o['customer_phone']),
+    "items": ExportColumn('Items', ("items.name", "items.quantity"), _items),
+    "total_amount": ExportColumn('Total Amount', ("total_amount",), lambda o: f"${o['total_amount']:.2f}"),
+    "pickup_time": ExportColumn('Pickup Time', ("pickup_time",), lambda o: o['pickup_time']),
+    "special_requests": ExportColumn('Special Requests', ("special_requests",), lambda o: o.get('special_requests', '')),
+    "status": ExportColumn('Status', ("status",), lambda o: o.get('status', 'pending')),
+}
+
+
+def select_columns(fields: Optional[str]) -> List[str]:
+    """Parse a comma separated ``fields=`` value; raises ValueError on unknown names"""
+    if not fields:
+        return list(EXPORT_COLUMNS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if not names:
+        raise ValueError("No export fields selected")
+    if unknown:
+        raise ValueError(
+            f"Unknown export fields: {', '.join(unknown)}. Available: {', '.join(EXPORT_COLUMNS)}"
+        )
+    return names
+
+
+def build_query(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Dict[str, Any]:
+    """Order filter for ``date_from <= order_date < date_to``"""
+    order_date: Dict[str, datetime] = {}
+    if date_from is not None:
+        order_date["$gte"] = date_from
+    if date_to is not None:
+        order_date["$lt"] = date_to
+    return {"order_date": order_date} if order_date else {}
+
+
+def changes_query(since: Optional[datetime], until: datetime) -> Dict[str, Any]:
+    """Order filter for ``since <= updated_at < until``"""
+    if since is None:
+        # First export: also orders stored before updated_at existed
+        return {"updated_at": {"$not": {"$gte": until}}}
+    return {"updated_at": {"$gte": since, "$lt": until}}
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like the stored timestamps"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "x-gzip"):
+            q = params.strip().replace(" ", "")
+            return q not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+async def stream_orders_csv(
+    collection,
+    query: Dict[str, Any],
+    columns: List[str],
+    batch_size: int = 500,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield the CSV export one encoded chunk per cursor batch"""
+    selected = [EXPORT_COLUMNS[name] for name in columns]
+    projection = {"_id": 0}
+    for column in selected:
+        projection.update({field: 1 for field in column.source})
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+    def take() -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow([column.header for column in selected])
+    rows = 0
+    cursor = collection.find(query, projection).sort("order_date", -1).batch_size(batch_size)
+    async for order in cursor:
+        writer.writerow([column.value(order) for column in selected])
+        rows += 1
+        if rows % batch_size == 0:
+            chunk = take()
+            if chunk:
+                yield chunk
+
+    chunk = take()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+async def stream_orders_ndjson(
+    collection,
+    query: Dict[str, Any],
+    encode: Callable[[Dict[str, Any]], bytes],
+    batch_size: int = 500,
+) -> AsyncIterator[bytes]:
+    """Yield one JSON line per order in (updated_at, id) order, a cursor batch per chunk"""
+    lines: List[bytes] = []
+    cursor = collection.find(query, {"_id": 0}).sort([("updated_at", 1), ("id", 1)]).batch_size(batch_size)
+    async for order in cursor:
+        lines.append(encode(order))
+        if len(lines) == batch_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
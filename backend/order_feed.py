@@ -0,0 +1,152 @@
+"""Live order feed for the admin dashboard, pushed as server-sent events.
+
+``create_order`` publishes every stored order into an in-process
+``OrderFeed``; each connected dashboard holds a bounded queue and receives
+the new order plus the delta it adds to the admin stats, so it can update
+its list and counters without re-fetching them. Status changes are
+published the same way; a cancellation carries the delta it takes off
+the stats. An event is serialized once and the same bytes are
+handed to every subscriber.
+
+A subscriber that stops reading is dropped once its queue is full rather
+than letting the queue grow; it gets a ``resync`` event and should reload
+its data. With several workers an event is only published in the worker
+that handled the request, so multi-worker deployments run ``watch_orders``
+instead, which feeds each worker's ``OrderFeed`` from a MongoDB change
+stream (this needs a replica set).
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from pymongo.errors import PyMongoError
+
+from order_status import CANCELLED
+
+logger = logging.getLogger(__name__)
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+
+
+def format_event(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """One SSE message; ``data`` must be single-line JSON"""
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id else "")
+    return head.encode() + b"data: " + data + b"\n\n"
+
+
+def stats_delta(order, now: datetime) -> Dict[str, float]:
+    """What one new order adds to the /admin/stats counters (UTC day)"""
+    today = order.order_date.date() == now.date()
+    return {
+        "total_orders": 1,
+        "today_orders": 1 if today else 0,
+        "today_revenue": order.total_amount if today else 0,
+    }
+
+
+def cancellation_delta(order: Dict[str, Any], now: datetime) -> Dict[str, float]:
+    """What cancelling a stored order takes off the /admin/stats counters (UTC day)"""
+    today = order["order_date"].date() == now.date()
+    return {
+        "total_orders": -1,
+        "today_orders": -1 if today else 0,
+        "today_revenue": -order["total_amount"] if today else 0,
+    }
+
+
+class OrderFeed:
+    """Fan-out of new orders to connected dashboards.
+
+    ``encode`` turns an ``Order`` into its JSON bytes; it only runs when
+    somebody is subscribed.
+    """
+
+    def __init__(self, encode: Callable[[Any], bytes], queue_size: int = 100, heartbeat: float = 15.0):
+        self.encode = encode
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, message: bytes) -> None:
+        """Hand an encoded event to every subscriber without waiting"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: stop feeding it and tell it to reload
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                queue.put_nowait(None)
+
+    def publish_order(self, order, now: Optional[datetime] = None) -> None:
+        """Publish a stored order with the stats delta it causes"""
+        if not self._subscribers:
+            return
+        delta = json.dumps(stats_delta(order, now or datetime.utcnow()), separators=(",", ":")).encode()
+        self.publish(format_event("order", b'{"order":' + self.encode(order) + b',"stats":' + delta + b"}", order.id))
+
+    def publish_status(self, order: Dict[str, Any], status: str, now: Optional[datetime] = None) -> None:
+        """Publish a stored order's new status, with the stats delta when it was cancelled"""
+        if not self._subscribers:
+            return
+        event = {"id": order["id"], "status": status}
+        if status == CANCELLED:
+            event["stats"] = cancellation_delta(order, now or datetime.utcnow())
+        data = json.dumps(event, separators=(",", ":")).encode()
+        self.publish(format_event("status", data))
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Events for one client until it disconnects (or is dropped)"""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self._subscribers.discard(queue)
+
+
+async def watch_orders(collection, feed: OrderFeed, parse: Callable[[Dict], Any], retry_delay: float = 5.0) -> None:
+    """Publish orders created or moved to a new status by any worker from a change stream.
+
+    ``parse`` turns a stored order document into an ``Order``. Runs until
+    cancelled; after an error it reconnects and resumes from the last event
+    it saw.
+    """
+    pipeline = [{"$match": {"$or": [
+        {"operationType": "insert"},
+        {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}},
+    ]}}]
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    if change["operationType"] == "insert":
+                        feed.publish_order(parse(change["fullDocument"]))
+                    elif change.get("fullDocument"):
+                        order = change["fullDocument"]
+                        feed.publish_status(order, change["updateDescription"]["updatedFields"]["status"])
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError:
+            logger.exception("Order change stream failed; retrying in %.0fs", retry_delay)
+            await asyncio.sleep(retry_delay)
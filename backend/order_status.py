@@ -0,0 +1,48 @@
+"""Order status workflow.
+
+    pending -> preparing -> ready -> picked_up
+
+and any order that has not been picked up can be cancelled.
+
+A transition is applied as a single conditional update whose filter only
+matches orders in a status the target may be reached from, so two staff
+members advancing the same order concurrently cannot both succeed and an
+order can never skip back. Bulk changes run the same guarded update for
+each order, concurrently, so every order's result comes from its own
+update.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+PENDING = "pending"
+PREPARING = "preparing"
+READY = "ready"
+PICKED_UP = "picked_up"
+CANCELLED = "cancelled"
+
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    PENDING: (PREPARING, CANCELLED),
+    PREPARING: (READY, CANCELLED),
+    READY: (PICKED_UP, CANCELLED),
+    PICKED_UP: (),
+    CANCELLED: (),
+}
+
+# target status -> statuses it can be reached from
+SOURCES: Dict[str, List[str]] = {
+    status: [source for source, targets in TRANSITIONS.items() if status in targets] for status in TRANSITIONS
+}
+
+
+def transition_filter(order_id: str, status: str) -> Dict[str, Any]:
+    return {"id": order_id, "status": {"$in": SOURCES[status]}}
+
+
+def transition_update(status: str, now: datetime) -> Dict[str, Any]:
+    return {"$set": {"status": status, "updated_at": now}}
+
+
+def conflict_detail(current: str, status: str) -> str:
+    """Why an order in ``current`` could not move to ``status``"""
+    allowed = ", ".join(TRANSITIONS.get(current, ())) or "none"
+    return f"Cannot change status from {current} to {status} (allowed: {allowed})"
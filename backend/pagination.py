@@ -0,0 +1,62 @@
+"""Keyset pagination over ``(order_date, id)``, newest first.
+
+A page is fetched with a range condition on the sort key instead of
+``skip``, so every page costs the same index walk however deep the client
+has paged. The continuation token is the last row's sort key, base64
+encoded so clients treat it as opaque.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+ORDER_SORT = [("order_date", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    raw = json.dumps({"d": doc["order_date"].isoformat(), "i": doc["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+        return datetime.fromisoformat(key["d"]), str(key["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def after_cursor(token: Optional[str]) -> Dict[str, Any]:
+    """Query matching the rows that sort after ``token``"""
+    if not token:
+        return {}
+    order_date, order_id = decode_cursor(token)
+    return {
+        "$or": [
+            {"order_date": {"$lt": order_date}},
+            {"order_date": order_date, "id": {"$lt": order_id}},
+        ]
+    }
+
+
+async def fetch_page(
+    collection,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return up to ``limit`` orders after ``cursor`` and the token for the next page"""
+    if projection is not None and any(value for field, value in projection.items() if field != "_id"):
+        # An inclusion projection has to keep the sort key for the next token.
+        projection = {**projection, "order_date": 1, "id": 1}
+    docs = await collection.find(after_cursor(cursor), projection).sort(ORDER_SORT).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
@@ -0,0 +1,121 @@
+"""Kitchen prep list: item quantities per pickup slot.
+
+Every order adds its quantities to one counter document per (pickup slot,
+menu item) in ``prep_counts``, keyed ``"<slot start>|<item id>"``; a
+cancellation subtracts them again. Keys sort by slot first, so the prep
+list for any window of slots is one ``_id`` range query over the counters
+rather than an ``$unwind`` over the orders.
+
+``rebuild`` recomputes the counters from raw orders into a scratch
+collection and swaps it in with a rename, like the sales rollups.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from slots import PickupSlots, SlotError
+
+logger = logging.getLogger(__name__)
+
+PREP_PROJECTION = {"_id": 0, "pickup_time": 1, "items.id": 1, "items.name": 1, "items.quantity": 1}
+
+
+def parse_window(day: date, window: Optional[str]) -> Tuple[datetime, datetime]:
+    """``[start, end)`` for a ``HH:MM-HH:MM`` window on ``day``, or the whole day"""
+    if not window:
+        start = datetime.combine(day, time())
+        return start, start + timedelta(days=1)
+    try:
+        start_time, end_time = (time.fromisoformat(part.strip()) for part in window.split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid window {window!r}; expected HH:MM-HH:MM")
+    if end_time <= start_time:
+        raise ValueError(f"Invalid window {window!r}; it must end after it starts")
+    return datetime.combine(day, start_time), datetime.combine(day, end_time)
+
+
+class PrepList:
+    def __init__(self, db, slot_for: Callable[[str], datetime], collection: str = "prep_counts"):
+        self.db = db
+        self.slot_for = slot_for
+        self.name = collection
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    def _increments(self, orders: Iterable[Dict[str, Any]], sign: int) -> Dict[str, Dict[str, Any]]:
+        counters: Dict[str, Dict[str, Any]] = {}
+        for order in orders:
+            try:
+                slot = self.slot_for(order["pickup_time"])
+            except SlotError:
+                continue  # placed before pickup slots; it has no window
+            for item in order["items"]:
+                key = f"{PickupSlots.key(slot)}|{item['id']}"
+                counter = counters.setdefault(
+                    key, {"slot": slot, "item_id": item["id"], "name": item["name"], "quantity": 0}
+                )
+                counter["quantity"] += item["quantity"] * sign
+        return counters
+
+    @staticmethod
+    def _updates(counters: Dict[str, Dict[str, Any]]) -> List[UpdateOne]:
+        return [
+            UpdateOne(
+                {"_id": key},
+                {
+                    "$inc": {"quantity": counter["quantity"]},
+                    "$setOnInsert": {"slot": counter["slot"], "item_id": counter["item_id"], "name": counter["name"]},
+                },
+                upsert=True,
+            )
+            for key, counter in counters.items()
+        ]
+
+    async def record(self, orders: Iterable[Dict[str, Any]], sign: int = 1) -> None:
+        """Add orders to the counters (``sign=-1`` takes cancelled orders back out)"""
+        counters = self._increments(orders, sign)
+        if counters:
+            await self.collection.bulk_write(self._updates(counters), ordered=False)
+
+    async def window(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Total quantity per item for slots starting in ``[start, end)``, largest first"""
+        query = {"_id": {"$gte": PickupSlots.key(start), "$lt": PickupSlots.key(end)}, "quantity": {"$gt": 0}}
+        totals: Dict[str, Dict[str, Any]] = {}
+        async for counter in self.collection.find(query, {"_id": 0, "item_id": 1, "name": 1, "quantity": 1}):
+            entry = totals.setdefault(
+                counter["item_id"], {"item_id": counter["item_id"], "name": counter["name"], "quantity": 0}
+            )
+            entry["quantity"] += counter["quantity"]
+        return sorted(totals.values(), key=lambda entry: entry["quantity"], reverse=True)
+
+    async def rebuild(self, orders, chunk_size: int = 1000) -> int:
+        """Recompute the counters from non-cancelled ``orders`` and atomically replace them"""
+        scratch = self.db[f"{self.name}_rebuild"]
+        await scratch.drop()
+        processed = 0
+        written = False
+        chunk: List[Dict[str, Any]] = []
+        cursor = orders.find({"status": {"$ne": "cancelled"}}, PREP_PROJECTION).batch_size(chunk_size)
+        async for order in cursor:
+            chunk.append(order)
+            processed += 1
+            if len(chunk) == chunk_size:
+                written |= await self._write(scratch, chunk)
+                chunk = []
+        written |= await self._write(scratch, chunk)
+        if not written:
+            # rename needs the source collection to exist
+            await self.db.create_collection(scratch.name)
+        await scratch.rename(self.name, dropTarget=True)
+        logger.info("Rebuilt prep counts from %d orders", processed)
+        return processed
+
+    async def _write(self, collection, orders: List[Dict[str, Any]]) -> bool:
+        counters = self._increments(orders, 1)
+        if counters:
+            await collection.bulk_write(self._updates(counters), ordered=False)
+        return bool(counters)
@@ -0,0 +1,144 @@
+"""Server-side order pricing from an in-memory index of the menu.
+
+Orders carry the client's idea of each item's price and of the total;
+neither is trusted. ``MenuPriceIndex`` keeps the id, name, price and
+availability of every menu item in a dict, loaded from ``menu_items`` on
+first use and reloaded after ``invalidate()`` or ``ttl`` seconds, so
+pricing an order costs one dict lookup per line instead of a database
+round-trip. ``price_orders`` prices a whole batch against one snapshot of
+the index in a single pass.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class PricingError(ValueError):
+    """The order references items that cannot be sold; ``problems`` lists why"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+@dataclass(frozen=True)
+class PricedItem:
+    id: str
+    name: str
+    price: float
+    category: str
+    available: bool
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    items: Dict[str, PricedItem]
+    version: int
+    loaded_at: float
+
+
+def price_items(items: Sequence[Dict[str, Any]], index: Dict[str, PricedItem]) -> Tuple[List[Dict[str, Any]], float]:
+    """Cart lines rewritten with menu names and prices, and the order total.
+
+    Raises PricingError if any line is unknown, unavailable or has a
+    quantity below one.
+    """
+    priced = []
+    problems = []
+    total = 0.0
+    for line in items:
+        item = index.get(line["id"])
+        if item is None:
+            problems.append(f"Unknown menu item {line['id']!r}")
+        elif not item.available:
+            problems.append(f"{item.name} is not available")
+        elif line["quantity"] < 1:
+            problems.append(f"Invalid quantity {line['quantity']} for {item.name}")
+        else:
+            priced.append({
+                "id": item.id,
+                "name": item.name,
+                "price": item.price,
+                "quantity": line["quantity"],
+                "category": item.category,
+            })
+            total += item.price * line["quantity"]
+    if not items:
+        problems.append("Order has no items")
+    if problems:
+        raise PricingError(problems)
+    return priced, round(total, 2)
+
+
+def price_orders(
+    orders: Sequence[Sequence[Dict[str, Any]]], index: Dict[str, PricedItem]
+) -> List[Tuple[Optional[List[Dict[str, Any]]], Optional[float], Optional[PricingError]]]:
+    """Price the item lists of many orders against the same snapshot.
+
+    Returns ``(items, total, None)`` per priceable order and
+    ``(None, None, error)`` for the rest, in input order.
+    """
+    results = []
+    for items in orders:
+        try:
+            priced, total = price_items(items, index)
+            results.append((priced, total, None))
+        except PricingError as e:
+            results.append((None, None, e))
+    return results
+
+
+class MenuPriceIndex:
+    """Menu items by id, reloaded after ``invalidate()`` or ``ttl`` seconds.
+
+    Mirrors ``MenuCache``: the version bumped by ``invalidate()`` discards
+    loads that were in flight, and one lock keeps concurrent orders from
+    each reloading the menu.
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[List[dict]]], ttl: float = 300.0):
+        self._loader = loader
+        self.ttl = ttl
+        self._version = 0
+        self._snapshot: Optional[PriceSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._snapshot = None
+
+    def _fresh(self) -> Optional[PriceSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self._version:
+            return None
+        if time.monotonic() - snapshot.loaded_at >= self.ttl:
+            return None
+        return snapshot
+
+    async def _load(self, version: int) -> PriceSnapshot:
+        items = {
+            doc["id"]: PricedItem(
+                id=doc["id"],
+                name=doc["name"],
+                price=doc["price"],
+                category=doc["category"],
+                available=doc.get("available", True),
+            )
+            for doc in await self._loader()
+        }
+        return PriceSnapshot(items=items, version=version, loaded_at=time.monotonic())
+
+    async def get(self) -> Dict[str, PricedItem]:
+        snapshot = self._fresh()
+        if snapshot is not None:
+            return snapshot.items
+        async with self._lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                return snapshot.items
+            version = self._version
+            snapshot = await self._load(version)
+            if version == self._version and self.ttl > 0:
+                self._snapshot = snapshot
+            return snapshot.items
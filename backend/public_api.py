@@ -0,0 +1,214 @@
+"""Routes used by the storefront: the menu, pickup slots and placing orders."""
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pymongo.errors import BulkWriteError
+
+import services
+from api_common import MAX_ORDER_PAGE_SIZE, admit_write, list_orders
+from models import (
+    BATCH_RESULTS, ORDER, ORDER_PROJECTION, BatchOrderResult, MenuItem, Order, OrderBatch, OrderCreate, PickupSlot,
+)
+from order_emails import send_order_confirmation_email, send_order_confirmation_emails
+from price_index import PricingError, price_items, price_orders
+from responses import DOCUMENT_LIST, TypedJSONResponse
+from slots import SlotError
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/")
+async def root():
+    return {"message": "Welcome to Artisan Bakery & Café API"}
+
+
+@router.get("/menu", response_model=List[MenuItem])
+async def get_menu(if_none_match: Optional[str] = Header(None)):
+    """Get all menu items"""
+    return await services.menu_cache.response(None, if_none_match)
+
+
+@router.get("/menu/search", response_model=List[MenuItem])
+async def search_menu(
+    q: Optional[str] = None,
+    exclude_ingredients: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Menu items matching every word of q (as prefixes), best first
+
+    exclude_ingredients is a comma separated list, e.g. "egg, milk"; items
+    with a matching ingredient are left out.
+    """
+    return TypedJSONResponse(await services.menu_search.search(q, exclude_ingredients, limit), DOCUMENT_LIST)
+
+
+@router.get("/menu/{category}", response_model=List[MenuItem])
+async def get_menu_by_category(category: str, if_none_match: Optional[str] = Header(None)):
+    """Get menu items by category (bakery or cafe)"""
+    return await services.menu_cache.response(category, if_none_match)
+
+
+@router.get("/slots", response_model=List[PickupSlot])
+async def get_pickup_slots(day: date = Query(..., alias="date")):
+    """Pickup slots for a day with the number of orders each can still take"""
+    return await services.pickup_slots.day(day)
+
+
+@router.get("/orders", response_model=List[Order])
+async def get_orders(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_ORDER_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    """Get orders, newest first, one page at a time"""
+    return await list_orders(cursor, limit, fields)
+
+
+@router.get("/orders/{order_id}", response_model=Order)
+async def get_order(order_id: str):
+    """Get specific order by ID"""
+    order = await services.db.orders.find_one({"id": order_id}, ORDER_PROJECTION)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return TypedJSONResponse(ORDER.validate_python(order), ORDER)
+
+
+@router.post("/orders", response_model=Order, dependencies=[Depends(admit_write)])
+async def create_order(order_data: OrderCreate):
+    """Create a new order and send confirmation email
+
+    Item names, prices and the total are taken from the menu, not the client,
+    and a place in the pickup slot is reserved before the order is stored.
+    """
+    pickup_slots = services.pickup_slots
+    try:
+        items, total_amount = price_items([item.dict() for item in order_data.items], await services.menu_prices.get())
+        slot = pickup_slots.bookable_slot(order_data.pickup_time)
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=e.problems)
+    except SlotError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not await pickup_slots.reserve(slot):
+        raise HTTPException(status_code=409, detail=f"Pickup slot {pickup_slots.key(slot)} is full")
+
+    now = datetime.utcnow()
+    order = Order(**{
+        **order_data.dict(), "items": items, "total_amount": total_amount, "order_date": now, "updated_at": now,
+    })
+    try:
+        await services.db.orders.insert_one(order.dict())
+    except Exception:
+        await pickup_slots.release(slot)
+        raise
+
+    await services.record_counters([order.dict()])
+
+    # Queue confirmation email
+    await send_order_confirmation_email(order)
+
+    if not services.settings.order_feed_change_stream:
+        services.order_feed.publish_order(order)
+
+    return TypedJSONResponse(order, ORDER)
+
+
+@router.post("/orders/batch", response_model=List[BatchOrderResult], dependencies=[Depends(admit_write)])
+async def create_orders_batch(batch: OrderBatch):
+    """Create many orders (e.g. an offline queue being replayed) with one insert
+
+    Each order carries a client-generated idempotency_key backed by a unique
+    index, so replaying a batch after a dropped connection reports the
+    orders that already exist as "duplicate" instead of creating them again.
+    Orders that cannot be priced or whose pickup slot is full are reported
+    as "error" and not stored.
+    """
+    db, pickup_slots = services.db, services.pickup_slots
+    results: Dict[str, BatchOrderResult] = {}
+    keys = list(dict.fromkeys(order_data.idempotency_key for order_data in batch.orders))
+    async for existing in db.orders.find({"idempotency_key": {"$in": keys}}, ORDER_PROJECTION):
+        key = existing["idempotency_key"]
+        results[key] = BatchOrderResult(idempotency_key=key, status="duplicate", order=ORDER.validate_python(existing))
+
+    new_orders: Dict[str, Order] = {}
+    slots: Dict[str, datetime] = {}
+    now = datetime.utcnow()
+    local_now = datetime.now()  # pickup times are the shop's local time
+    pricing = price_orders([[item.dict() for item in o.items] for o in batch.orders], await services.menu_prices.get())
+    for order_data, (items, total_amount, error) in zip(batch.orders, pricing):
+        key = order_data.idempotency_key
+        if key in results:
+            continue
+        try:
+            if error is not None:
+                raise error
+            slots[key] = pickup_slots.bookable_slot(order_data.pickup_time, local_now)
+        except (PricingError, SlotError) as e:
+            results[key] = BatchOrderResult(idempotency_key=key, status="error", detail=str(e))
+            continue
+        new_orders[key] = Order(**{
+            **order_data.dict(exclude={"idempotency_key"}), "items": items, "total_amount": total_amount,
+            "order_date": now, "updated_at": now,
+        })
+        results[key] = BatchOrderResult(idempotency_key=key, status="created", order=new_orders[key])
+
+    # One reservation per slot; orders past a slot's capacity are turned away in batch order
+    by_slot: Dict[datetime, List[str]] = {}
+    for key in new_orders:
+        by_slot.setdefault(slots[key], []).append(key)
+    for slot, slot_keys in by_slot.items():
+        granted = await pickup_slots.reserve(slot, len(slot_keys))
+        for key in slot_keys[granted:]:
+            del new_orders[key]
+            results[key] = BatchOrderResult(
+                idempotency_key=key, status="error", detail=f"Pickup slot {pickup_slots.key(slot)} is full"
+            )
+
+    documents = [{**order.dict(), "idempotency_key": key} for key, order in new_orders.items()]
+    duplicate_keys = []
+    try:
+        if documents:
+            await db.orders.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        # Some documents may have been stored; only the failed ones give their place back
+        for error in e.details.get("writeErrors", []):
+            key = documents[error["index"]]["idempotency_key"]
+            await pickup_slots.release(slots[key])
+            if error.get("code") == 11000:
+                duplicate_keys.append(key)
+                results[key] = BatchOrderResult(idempotency_key=key, status="duplicate")
+            else:
+                results[key] = BatchOrderResult(idempotency_key=key, status="error", detail=error.get("errmsg"))
+    except Exception:
+        # e.g. a lost connection: whether anything was stored is unknown, so
+        # free every place, as create_order does; a replay of the batch
+        # then reports stored orders as duplicates
+        for key in new_orders:
+            await pickup_slots.release(slots[key])
+        raise
+
+    # Stored by a concurrent request since the lookup above
+    if duplicate_keys:
+        async for existing in db.orders.find({"idempotency_key": {"$in": duplicate_keys}}, ORDER_PROJECTION):
+            key = existing["idempotency_key"]
+            results[key].order = ORDER.validate_python(existing)
+
+    created = [order for key, order in new_orders.items() if results[key].status == "created"]
+    if created:
+        await services.record_counters([order.dict() for order in created])
+        await send_order_confirmation_emails(created)
+        if not services.settings.order_feed_change_stream:
+            for order in created:
+                services.order_feed.publish_order(order)
+
+    # A key repeated within the batch reports the first occurrence's order as a duplicate
+    response = []
+    seen = set()
+    for order_data in batch.orders:
+        key = order_data.idempotency_key
+        result = results[key]
+        if key in seen and result.status == "created":
+            result = BatchOrderResult(idempotency_key=key, status="duplicate", order=result.order)
+        seen.add(key)
+        response.append(result)
+    return TypedJSONResponse(response, BATCH_RESULTS)
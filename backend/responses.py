@@ -0,0 +1,25 @@
+"""JSON responses serialized by pydantic-core.
+
+Handlers that already hold validated models return them through
+``TypedJSONResponse`` so FastAPI skips its own ``response_model``
+validation and ``jsonable_encoder`` pass; the body is produced in one
+step by the adapter's Rust serializer.
+"""
+from typing import Any, Dict, List
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+# For plain Mongo documents (e.g. projected fields); serialized, not validated.
+DOCUMENT_LIST = TypeAdapter(List[Dict[str, Any]])
+
+
+class TypedJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, content: Any, adapter: TypeAdapter, **kwargs):
+        self.adapter = adapter
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
@@ -0,0 +1,164 @@
+"""Revenue time series in hour, day or week buckets.
+
+Buckets are computed with one ``$group`` on ``$dateTrunc`` of
+``order_date`` (MongoDB 5.0+). Once a bucket has closed its totals cannot
+change except through a cancellation, so closed buckets are kept in
+memory and in the ``revenue_buckets`` collection, keyed
+``"<unit>|<bucket start>"`` so that any range of them is one ``_id`` range
+query. A request only aggregates the buckets that are still open plus
+closed ones nobody has computed yet, one range per run of consecutive
+buckets so cached ones in between are not recounted; a cancellation
+evicts the buckets its order falls into.
+
+A bucket counts as closed ``grace`` seconds after it ends, so orders
+stamped just before the boundary but stored just after it are included
+before it is cached. Buckets are UTC, like ``order_date``; weeks start on
+Monday.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+STEPS: Dict[str, timedelta] = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+
+def truncate(when: datetime, unit: str) -> datetime:
+    """Start of the ``unit`` bucket containing ``when``, as ``$dateTrunc`` computes it"""
+    if unit == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def bucket_starts(unit: str, start: datetime, end: datetime) -> List[datetime]:
+    """Starts of the buckets overlapping ``[start, end)``"""
+    step = STEPS[unit]
+    starts = []
+    bucket = truncate(start, unit)
+    while bucket < end:
+        starts.append(bucket)
+        bucket += step
+    return starts
+
+
+def bucket_ranges(buckets: List[datetime], step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """``[start, end)`` ranges covering runs of consecutive bucket starts (ascending)"""
+    ranges: List[Tuple[datetime, datetime]] = []
+    for bucket in buckets:
+        if ranges and ranges[-1][1] == bucket:
+            ranges[-1] = (ranges[-1][0], bucket + step)
+        else:
+            ranges.append((bucket, bucket + step))
+    return ranges
+
+
+def revenue_pipeline(unit: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    return [
+        {"$match": {"order_date": {"$gte": start, "$lt": end}, "status": {"$ne": "cancelled"}}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$order_date", "unit": unit, "startOfWeek": "monday"}},
+            "orders": {"$sum": 1},
+            "revenue": {"$sum": "$total_amount"},
+        }},
+    ]
+
+
+def _key(unit: str, start: datetime) -> str:
+    return f"{unit}|{start.strftime('%Y-%m-%dT%H:%M')}"
+
+
+def _empty() -> Dict[str, Any]:
+    return {"orders": 0, "revenue": 0.0}
+
+
+class RevenueSeries:
+    def __init__(self, db, grace: float = 60.0, collection: str = "revenue_buckets"):
+        self.db = db
+        self.grace = timedelta(seconds=grace)
+        self.name = collection
+        self._closed: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        # Bumped by every eviction; a computation that overlaps one is not cached
+        self._generation = 0
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    async def series(self, unit: str, start: datetime, end: datetime, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Orders and revenue per ``unit`` bucket overlapping ``[start, end)``, oldest first"""
+        now = now or datetime.utcnow()
+        step = STEPS[unit]
+        starts = bucket_starts(unit, start, end)
+        closed = [bucket for bucket in starts if bucket + step <= now - self.grace]
+        missing = [bucket for bucket in closed if (unit, bucket) not in self._closed]
+        if missing:
+            await self._load(unit, missing[0], missing[-1] + step)
+            missing = [bucket for bucket in missing if (unit, bucket) not in self._closed]
+
+        computed: Dict[datetime, Dict[str, Any]] = {}
+        recompute = missing + starts[len(closed):]
+        if recompute:
+            generation = self._generation
+            for part in await asyncio.gather(
+                *(self._aggregate(unit, start, end) for start, end in bucket_ranges(recompute, step))
+            ):
+                computed.update(part)
+            if missing and generation == self._generation:
+                await self._store(unit, {bucket: computed.get(bucket, _empty()) for bucket in missing})
+
+        series = []
+        for bucket in starts:
+            totals = self._closed.get((unit, bucket)) or computed.get(bucket) or _empty()
+            series.append({"start": bucket, "end": bucket + step, **totals})
+        return series
+
+    def forget(self, order_dates: Iterable[datetime]) -> List[str]:
+        """Drop the in-memory buckets containing these order dates; returns their keys"""
+        keys = set()
+        for order_date in order_dates:
+            for unit in STEPS:
+                bucket = truncate(order_date, unit)
+                self._closed.pop((unit, bucket), None)
+                keys.add(_key(unit, bucket))
+        if keys:
+            self._generation += 1
+        return sorted(keys)
+
+    async def evict(self, order_dates: Iterable[datetime]) -> None:
+        """Forget the cached buckets containing these order dates, e.g. after cancellations"""
+        keys = self.forget(order_dates)
+        if keys:
+            await self.collection.delete_many({"_id": {"$in": keys}})
+
+    async def _load(self, unit: str, start: datetime, end: datetime) -> None:
+        query = {"_id": {"$gte": _key(unit, start), "$lt": _key(unit, end)}}
+        async for doc in self.collection.find(query, {"_id": 0, "start": 1, "orders": 1, "revenue": 1}):
+            self._closed[unit, doc["start"]] = {"orders": doc["orders"], "revenue": doc["revenue"]}
+
+    async def _aggregate(self, unit: str, start: datetime, end: datetime) -> Dict[datetime, Dict[str, Any]]:
+        return {
+            row["_id"]: {"orders": row["orders"], "revenue": round(row["revenue"], 2)}
+            async for row in self.db.orders.aggregate(revenue_pipeline(unit, start, end))
+        }
+
+    async def _store(self, unit: str, buckets: Dict[datetime, Dict[str, Any]]) -> None:
+        # Empty buckets are stored too, so quiet hours are not recounted either
+        self._closed.update({(unit, bucket): totals for bucket, totals in buckets.items()})
+        try:
+            await self.collection.bulk_write([
+                ReplaceOne({"_id": _key(unit, bucket)}, {"unit": unit, "start": bucket, **totals}, upsert=True)
+                for bucket, totals in buckets.items()
+            ], ordered=False)
+        except Exception:
+            logger.exception("Failed to cache %d %s revenue buckets", len(buckets), unit)
@@ -0,0 +1,185 @@
+"""Incrementally maintained sales rollups.
+
+``create_order`` folds every new order into a handful of counter documents
+in the ``sales_rollups`` collection with one unordered ``bulk_write`` of
+``$inc`` upserts, so analytics read precomputed totals instead of scanning
+the order history:
+
+- ``{"_id": "total"}``: all-time order count, revenue and item quantity
+- ``{"_id": "day:YYYY-MM-DD"}``: the same counters per UTC day
+- ``{"_id": "item:<name>"}``: quantity sold, line revenue and order count per item
+
+Cancelled orders are taken back out with ``sign=-1``.
+
+The totals document doubles as the marker that the rollups are built: it
+is only ever created by ``initialize`` (on an empty database) or
+``rebuild``. Until it exists, recording is skipped, so a database that
+already had orders keeps using the full-scan fallbacks rather than
+counters holding only the orders placed since the upgrade.
+
+``rebuild`` recomputes everything from raw orders in chunks into a scratch
+collection and swaps it in with a rename, so readers never see a
+half-built state.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "total"
+DAY = "day"
+ITEM = "item"
+
+
+def _day(order_date: datetime) -> datetime:
+    return order_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def order_increments(order: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Counter increments contributed by one order, keyed by rollup _id"""
+    total_amount = order.get("total_amount", 0)
+    quantity = sum(item["quantity"] for item in order.get("items", []))
+    day = _day(order["order_date"])
+    counters = {"orders": 1, "revenue": total_amount, "quantity": quantity}
+
+    increments: Dict[str, Dict[str, Any]] = {
+        TOTAL: {"kind": TOTAL, "inc": dict(counters)},
+        f"{DAY}:{day.date().isoformat()}": {"kind": DAY, "set": {"day": day}, "inc": dict(counters)},
+    }
+    for item in order.get("items", []):
+        key = f"{ITEM}:{item['name']}"
+        entry = increments.setdefault(
+            key, {"kind": ITEM, "set": {"name": item["name"]}, "inc": {"orders": 1, "revenue": 0, "quantity": 0}}
+        )
+        entry["inc"]["quantity"] += item["quantity"]
+        entry["inc"]["revenue"] += item["price"] * item["quantity"]
+    return increments
+
+
+def merge_increments(target: Dict[str, Dict[str, Any]], increments: Dict[str, Dict[str, Any]]) -> None:
+    for key, entry in increments.items():
+        existing = target.get(key)
+        if existing is None:
+            target[key] = {"kind": entry["kind"], "set": dict(entry.get("set", {})), "inc": dict(entry["inc"])}
+            continue
+        for field, value in entry["inc"].items():
+            existing["inc"][field] = existing["inc"].get(field, 0) + value
+
+
+def _updates(increments: Dict[str, Dict[str, Any]], sign: int = 1, upsert_total: bool = True) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"_id": key},
+            {
+                "$inc": {field: value * sign for field, value in entry["inc"].items()},
+                "$setOnInsert": {"kind": entry["kind"], **entry.get("set", {})},
+            },
+            upsert=upsert_total or key != TOTAL,
+        )
+        for key, entry in increments.items()
+    ]
+
+
+class SalesRollups:
+    def __init__(self, db, collection: str = "sales_rollups"):
+        self.db = db
+        self.name = collection
+        self._built = False  # rollups are never unbuilt, so True is cached
+
+    @property
+    def collection(self):
+        return self.db[self.name]
+
+    async def built(self) -> bool:
+        """Whether initialize or rebuild has created the counters"""
+        if not self._built:
+            self._built = await self.totals() is not None
+        return self._built
+
+    async def record(self, order: Dict[str, Any], sign: int = 1) -> None:
+        """Fold one order into the counters (``sign=-1`` takes it back out)"""
+        await self.record_many([order], sign=sign)
+
+    async def record_many(self, orders: Iterable[Dict[str, Any]], sign: int = 1) -> None:
+        """Fold orders into the counters; skipped until the rollups are built"""
+        combined: Dict[str, Dict[str, Any]] = {}
+        for order in orders:
+            merge_increments(combined, order_increments(order))
+        if not combined or not await self.built():
+            return
+        # Never upsert the totals: if a rebuild has just swapped the
+        # collection, it must not be recreated from this order alone
+        await self.collection.bulk_write(_updates(combined, sign, upsert_total=False), ordered=False)
+
+    async def initialize(self, orders) -> bool:
+        """Start empty counters for a fresh database; False if a rebuild is needed"""
+        if await self.built():
+            return True
+        if await orders.count_documents({}, limit=1):
+            return False
+        await self.collection.update_one(
+            {"_id": TOTAL},
+            {"$setOnInsert": {"kind": TOTAL, "orders": 0, "revenue": 0, "quantity": 0}},
+            upsert=True,
+        )
+        self._built = True
+        return True
+
+    async def totals(self) -> Optional[Dict[str, Any]]:
+        """All-time counters, or None if the rollups have never been built"""
+        return await self.collection.find_one({"_id": TOTAL})
+
+    async def snapshot(self, day: datetime) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """The all-time totals and the counters for ``day``, in one query"""
+        day_key = f"{DAY}:{_day(day).date().isoformat()}"
+        docs = {doc["_id"]: doc async for doc in self.collection.find({"_id": {"$in": [TOTAL, day_key]}})}
+        return docs.get(TOTAL), docs.get(day_key)
+
+    async def popular_items(self, limit: int = 5) -> List[Dict[str, Any]]:
+        # Items whose every order was cancelled drop back to zero
+        cursor = self.collection.find({"kind": ITEM, "quantity": {"$gt": 0}}).sort("quantity", -1).limit(limit)
+        return [doc async for doc in cursor]
+
+    async def daily(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"kind": DAY}
+        if start is not None or end is not None:
+            query["day"] = {}
+            if start is not None:
+                query["day"]["$gte"] = _day(start)
+            if end is not None:
+                query["day"]["$lt"] = end
+        return await self.collection.find(query).sort("day", 1).to_list(None)
+
+    async def rebuild(self, orders, chunk_size: int = 1000) -> int:
+        """Recompute the rollups from ``orders`` and atomically replace them.
+
+        Orders are read ``chunk_size`` at a time and each chunk is merged and
+        written to a scratch collection with one bulk write, so memory use is
+        bounded by the chunk. Orders created while the rebuild runs may be
+        missed; run it when order intake is quiet.
+        """
+        scratch = self.db[f"{self.name}_rebuild"]
+        await scratch.drop()
+        processed = 0
+        chunk: Dict[str, Dict[str, Any]] = {}
+        projection = {"_id": 0, "order_date": 1, "total_amount": 1, "items": 1}
+        cursor = orders.find({"status": {"$ne": "cancelled"}}, projection).batch_size(chunk_size)
+        async for order in cursor:
+            merge_increments(chunk, order_increments(order))
+            processed += 1
+            if processed % chunk_size == 0:
+                await scratch.bulk_write(_updates(chunk), ordered=False)
+                chunk = {}
+        if chunk:
+            await scratch.bulk_write(_updates(chunk), ordered=False)
+        if processed == 0:
+            await scratch.insert_one({"_id": TOTAL, "kind": TOTAL, "orders": 0, "revenue": 0, "quantity": 0})
+        await scratch.create_index([("kind", 1), ("quantity", -1)], name="sales_rollups_kind_quantity")
+        await scratch.create_index([("kind", 1), ("day", 1)], name="sales_rollups_kind_day")
+        await scratch.rename(self.name, dropTarget=True)
+        self._built = True
+        logger.info("Rebuilt sales rollups from %d orders", processed)
+        return processed
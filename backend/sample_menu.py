@@ -0,0 +1,153 @@
+"""Menu seeded into an empty menu_items collection at startup (see bootstrap.py).
+
+Only the lifespan needs it, so server.py imports it there.
+"""
+SAMPLE_MENU_ITEMS = [
+    # Bakery Items
+    {
+        "name": "Artisan Croissants",
+        "description": "Buttery, flaky croissants baked fresh daily with French butter",
+        "price": 3.50,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1555507036-ab1f4038808a",
+        "ingredients": ["French flour", "Butter", "Yeast", "Milk"],
+        "available": True
+    },
+    {
+        "name": "Pain au Chocolat",
+        "description": "Classic French pastry with rich dark chocolate",
+        "price": 4.25,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1483695028939-5bb13f8648b0",
+        "ingredients": ["Pastry dough", "Dark chocolate", "Butter"],
+        "available": True
+    },
+    {
+        "name": "Artisan Sourdough Bread",
+        "description": "Traditional sourdough with a perfect crust and tangy flavor",
+        "price": 6.50,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1534432182912-63863115e106",
+        "ingredients": ["Sourdough starter", "Organic flour", "Sea salt"],
+        "available": True
+    },
+    {
+        "name": "French Macarons",
+        "description": "Delicate almond cookies with smooth ganache filling",
+        "price": 2.75,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1556742059-47b93231f536",
+        "ingredients": ["Almond flour", "Sugar", "Egg whites", "Various flavors"],
+        "available": True
+    },
+    {
+        "name": "Cinnamon Danish",
+        "description": "Flaky pastry swirled with cinnamon sugar and glaze",
+        "price": 4.00,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1534432182912-63863115e106",
+        "ingredients": ["Danish dough", "Cinnamon", "Sugar", "Glaze"],
+        "available": True
+    },
+    {
+        "name": "Chocolate Eclair",
+        "description": "Choux pastry filled with vanilla cream, topped with chocolate",
+        "price": 4.75,
+        "category": "bakery",
+        "image": "https://images.unsplash.com/photo-1483695028939-5bb13f8648b0",
+        "ingredients": ["Choux pastry", "Vanilla cream", "Chocolate glaze"],
+        "available": True
+    },
+    # Café Items
+    {
+        "name": "Signature Latte",
+        "description": "Expertly crafted with our house blend and steamed milk",
+        "price": 4.50,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1509042239860-f550ce710b93",
+        "ingredients": ["Espresso", "Steamed milk", "Latte art"],
+        "available": True
+    },
+    {
+        "name": "Cappuccino",
+        "description": "Rich espresso topped with velvety microfoam",
+        "price": 4.25,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1506619216599-9d16d0903dfd",
+        "ingredients": ["Double espresso", "Steamed milk", "Microfoam"],
+        "available": True
+    },
+    {
+        "name": "Cold Brew Coffee",
+        "description": "Smooth, refreshing cold brew steeped for 24 hours",
+        "price": 3.75,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1447933601403-0c6688de566e",
+        "ingredients": ["Cold brew concentrate", "Ice", "Optional milk"],
+        "available": True
+    },
+    {
+        "name": "Caramel Macchiato",
+        "description": "Vanilla syrup, steamed milk, espresso, and caramel drizzle",
+        "price": 5.25,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1518057111178-44a106bad636",
+        "ingredients": ["Espresso", "Vanilla syrup", "Steamed milk", "Caramel"],
+        "available": True
+    },
+    {
+        "name": "Green Tea Latte",
+        "description": "Premium matcha powder with steamed milk and honey",
+        "price": 4.75,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1509042239860-f550ce710b93",
+        "ingredients": ["Matcha powder", "Steamed milk", "Honey"],
+        "available": True
+    },
+    {
+        "name": "Hot Chocolate",
+        "description": "Rich Belgian chocolate with whipped cream and marshmallows",
+        "price": 4.00,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1506619216599-9d16d0903dfd",
+        "ingredients": ["Belgian chocolate", "Steamed milk", "Whipped cream"],
+        "available": True
+    },
+    # Café Savory Items
+    {
+        "name": "Spiced Meat Patty Burger",
+        "description": "Juicy beef patty seasoned with our secret spice blend, served on fresh brioche",
+        "price": 8.99,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1518057111178-44a106bad636",
+        "ingredients": ["Beef patty", "Brioche bun", "Secret spices", "Fresh lettuce"],
+        "available": True
+    },
+    {
+        "name": "Garden Veggie Patty",
+        "description": "House-made quinoa and black bean patty with avocado and fresh herbs",
+        "price": 7.99,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1509042239860-f550ce710b93",
+        "ingredients": ["Quinoa", "Black beans", "Avocado", "Fresh herbs"],
+        "available": True
+    },
+    {
+        "name": "Grilled Chicken Sandwich",
+        "description": "Tender grilled chicken breast with pesto and sundried tomatoes",
+        "price": 9.50,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1447933601403-0c6688de566e",
+        "ingredients": ["Chicken breast", "Pesto sauce", "Sundried tomatoes", "Ciabatta"],
+        "available": True
+    },
+    {
+        "name": "Fresh Breakfast Wrap",
+        "description": "Scrambled eggs, crispy bacon, and cheese wrapped in a warm tortilla",
+        "price": 6.75,
+        "category": "cafe",
+        "image": "https://images.unsplash.com/photo-1518057111178-44a106bad636",
+        "ingredients": ["Eggs", "Bacon", "Cheese", "Tortilla wrap"],
+        "available": True
+    }
+]
@@ -0,0 +1,161 @@
+"""The Mongo client, caches and background workers of one worker process.
+
+``configure(settings)`` (called by ``create_app`` in server.py) rebinds the
+module globals below; the routers read them as ``services.<name>`` at
+request time, so a new configuration reaches every handler.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from admission import AdmissionControl
+from email_outbox import EmailConfig, EmailOutbox, SMTPPool
+from invalidation import InvalidationBus
+from menu_cache import MenuCache
+from menu_search import MenuSearch
+from metrics import MongoCommandMetrics
+from models import ORDER, MenuItem
+from order_feed import OrderFeed
+from prep_list import PrepList
+from price_index import MenuPriceIndex
+from revenue import RevenueSeries
+from rollups import SalesRollups
+from settings import Settings
+from slots import PickupSlots
+from ttl_cache import CoalescingTTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def configure(new_settings: Settings):
+    """Build the Mongo client and the caches and workers bound to it (see create_app)"""
+    global settings, client, db, reporting_db, EMAIL_CONFIG, sales_rollups, reporting_rollups, email_outbox
+    global pickup_slots, prep_list, revenue_series, menu_cache, menu_prices, menu_search, admin_stats_cache
+    global invalidation_bus, admission
+    settings = new_settings
+
+    # A previous configuration's pool, e.g. the module-level app's when
+    # uvicorn runs server:create_app --factory
+    previous = globals().get("client")
+    if previous is not None:
+        previous.close()
+
+    # MongoDB connection; one pool per worker process
+    client = AsyncIOMotorClient(
+        settings.mongo_url, event_listeners=[MongoCommandMetrics()], **settings.motor_options()
+    )
+    db = client[settings.db_name]
+    # Reports and admin lists read through this handle, from a secondary when
+    # there is one (REPORTING_READ_PREFERENCE) so they do not compete with
+    # order writes. Writes, get_order, slots, prep lists, status changes and
+    # the change export stay on the primary.
+    reporting_db = client.get_database(settings.db_name, read_preference=settings.reporting_reads())
+
+    # Email configuration (you'll need to set these environment variables)
+    EMAIL_CONFIG = EmailConfig(
+        smtp_server=settings.smtp_server,
+        smtp_port=settings.smtp_port,
+        email=settings.smtp_email,
+        password=settings.smtp_password,
+        use_tls=settings.smtp_starttls,
+    )
+
+    # Per-day and per-item sales counters maintained by create_order
+    sales_rollups = SalesRollups(db)
+    reporting_rollups = SalesRollups(reporting_db)
+
+    # Confirmation emails are queued in Mongo and sent by background workers
+    email_outbox = EmailOutbox(
+        db.email_outbox,
+        SMTPPool(EMAIL_CONFIG, size=settings.smtp_pool_size),
+        workers=settings.email_workers,
+        max_attempts=settings.email_max_attempts,
+    )
+
+    # Pickup times are bucketed into PICKUP_SLOT_MINUTES slots of at most
+    # PICKUP_SLOT_CAPACITY orders; PICKUP_HOURS only decides which slots are listed
+    pickup_slots = PickupSlots(
+        db.pickup_slots,
+        capacity=settings.pickup_slot_capacity,
+        minutes=settings.pickup_slot_minutes,
+        opens=settings.pickup_opens,
+        closes=settings.pickup_closes,
+    )
+
+    # Item quantities per pickup slot for the kitchen
+    prep_list = PrepList(db, pickup_slots.slot_for)
+    # On the primary: a bucket read from a lagging secondary would be cached
+    # without the latest orders, and only the open bucket is aggregated anyway
+    revenue_series = RevenueSeries(db)
+
+    # Serialized menu responses, revalidated at most every MENU_CACHE_TTL seconds.
+    menu_cache = MenuCache(load_menu_items, ttl=settings.menu_cache_ttl)
+    # Orders are priced from this index rather than from the client's cart
+    menu_prices = MenuPriceIndex(load_menu_prices, ttl=settings.menu_cache_ttl)
+    # Built at startup; reloads re-index only the items that changed
+    menu_search = MenuSearch(load_menu_items, ttl=settings.menu_cache_ttl)
+
+    # Concurrent dashboard polls within ADMIN_STATS_TTL seconds share one computation
+    admin_stats_cache = CoalescingTTLCache(ttl=settings.admin_stats_ttl)
+
+    # Writes beyond WRITE_CONCURRENCY (plus a short queue) or a client's rate are shed
+    admission = AdmissionControl(
+        limit=settings.write_concurrency,
+        queue_size=settings.write_queue_size,
+        queue_timeout=settings.write_queue_timeout,
+        rate=settings.write_rate_per_client,
+        burst=settings.write_burst_per_client,
+    )
+
+    # With several workers, invalidations made by one reach the others' caches
+    invalidation_bus = InvalidationBus(db)
+    invalidation_bus.subscribe("menu", lambda payload: invalidate_menu_locally())
+    invalidation_bus.subscribe("revenue", lambda payload: revenue_series.forget(payload["order_dates"]))
+
+
+# New orders pushed to admin dashboards. A single worker publishes what it
+# creates; with several workers set ORDER_FEED_CHANGE_STREAM=true so every
+# worker follows the orders collection instead (needs a replica set)
+order_feed = OrderFeed(ORDER.dump_json)
+
+
+async def load_menu_items(category: Optional[str] = None) -> List[dict]:
+    """Load menu items from MongoDB (seeded at startup by the lifespan)"""
+    query = {"category": category} if category else {}
+    items = await db.menu_items.find(query).to_list(1000)
+    return [MenuItem(**item).dict() for item in items]
+
+
+async def load_menu_prices() -> List[dict]:
+    return await db.menu_items.find(
+        {}, {"_id": 0, "id": 1, "name": 1, "price": 1, "category": 1, "available": 1}
+    ).to_list(None)
+
+
+def invalidate_menu_locally():
+    menu_cache.invalidate()
+    menu_prices.invalidate()
+    menu_search.invalidate()
+
+
+async def invalidate_menu():
+    """Call after writing to menu_items; other workers are told through the bus"""
+    invalidate_menu_locally()
+    await invalidation_bus.publish("menu")
+
+
+async def record_counters(orders: List[dict], sign: int = 1):
+    """Fold stored orders into the sales rollups and prep counts (sign=-1 takes them out)
+
+    The orders are already stored, so a failed counter update is only
+    logged; rebuild-rollups and rebuild-prep repair the counters.
+    """
+    async def update(name, record):
+        try:
+            await record(orders, sign=sign)
+        except Exception:
+            logger.exception("Failed to update %s for %d orders", name, len(orders))
+
+    await asyncio.gather(update("sales rollups", sales_rollups.record_many), update("prep counts", prep_list.record))
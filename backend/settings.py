@@ -0,0 +1,155 @@
+"""Server settings, read from the environment (and backend/.env).
+
+``create_app(settings)`` in server.py builds the Mongo client, the caches
+and background workers from one ``Settings``, so a worker process's whole
+configuration can be seen, and replaced in tests, in one place. See
+.env.example for the variables.
+"""
+import os
+from dataclasses import dataclass
+from datetime import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
+
+
+def _flag(value: str) -> bool:
+    return value.lower() == 'true'
+
+
+@dataclass(frozen=True)
+class Settings:
+    mongo_url: str
+    db_name: str
+    # Motor connection pool and timeouts; None keeps the driver's default
+    mongo_max_pool_size: Optional[int] = None
+    mongo_min_pool_size: Optional[int] = None
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_connect_timeout_ms: Optional[int] = None
+    mongo_server_selection_timeout_ms: Optional[int] = None
+    mongo_socket_timeout_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+    # Where reporting and admin reads go, and how far behind the primary
+    # they may be (-1: no limit; otherwise at least 90 seconds)
+    reporting_read_preference: str = "secondaryPreferred"
+    reporting_max_staleness: int = 90
+
+    cors_origins: Tuple[str, ...] = ("*",)
+    readiness_timeout: float = 2.0
+    # Share cache invalidations with the other workers through MongoDB
+    invalidation_bus: bool = False
+
+    # Admission control for the write endpoints, per worker (see admission.py)
+    write_concurrency: int = 32
+    write_queue_size: int = 64
+    write_queue_timeout: float = 2.0
+    # Off by default: behind a proxy every client has the proxy's address and
+    # would share one bucket, unless trust_forwarded_for is set as well
+    write_rate_per_client: float = 0.0  # requests per second; 0 disables
+    write_burst_per_client: float = 20.0
+    # Behind a proxy, identify clients by the address it appends to X-Forwarded-For
+    trust_forwarded_for: bool = False
+
+    smtp_server: str = 'smtp.gmail.com'
+    smtp_port: int = 587
+    smtp_email: str = ''
+    smtp_password: str = ''
+    smtp_starttls: bool = True
+    smtp_pool_size: int = 2
+    email_workers: int = 2
+    email_max_attempts: int = 5
+
+    pickup_slot_capacity: int = 10
+    pickup_slot_minutes: int = 15
+    pickup_opens: time = time(7, 0)
+    pickup_closes: time = time(19, 0)
+
+    order_feed_change_stream: bool = False
+    menu_cache_ttl: float = 300.0
+    order_page_size: int = 100
+    order_changes_settle: float = 5.0
+    admin_stats_ttl: float = 2.0
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "Settings":
+        opens, closes = environ.get('PICKUP_HOURS', '07:00-19:00').split('-')
+        return cls(
+            mongo_url=environ['MONGO_URL'],
+            db_name=environ['DB_NAME'],
+            mongo_max_pool_size=_optional_int(environ.get('MONGO_MAX_POOL_SIZE')),
+            mongo_min_pool_size=_optional_int(environ.get('MONGO_MIN_POOL_SIZE')),
+            mongo_max_idle_time_ms=_optional_int(environ.get('MONGO_MAX_IDLE_TIME_MS')),
+            mongo_connect_timeout_ms=_optional_int(environ.get('MONGO_CONNECT_TIMEOUT_MS')),
+            mongo_server_selection_timeout_ms=_optional_int(environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS')),
+            mongo_socket_timeout_ms=_optional_int(environ.get('MONGO_SOCKET_TIMEOUT_MS')),
+            mongo_wait_queue_timeout_ms=_optional_int(environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS')),
+            reporting_read_preference=environ.get('REPORTING_READ_PREFERENCE', 'secondaryPreferred'),
+            reporting_max_staleness=int(environ.get('REPORTING_MAX_STALENESS_SECONDS', '90')),
+            cors_origins=tuple(origin.strip() for origin in environ.get('CORS_ORIGINS', '*').split(',')),
+            readiness_timeout=float(environ.get('READINESS_TIMEOUT', '2')),
+            invalidation_bus=_flag(environ.get('CACHE_INVALIDATION_BUS', 'false')),
+            write_concurrency=int(environ.get('WRITE_CONCURRENCY', '32')),
+            write_queue_size=int(environ.get('WRITE_QUEUE_SIZE', '64')),
+            write_queue_timeout=float(environ.get('WRITE_QUEUE_TIMEOUT', '2')),
+            write_rate_per_client=float(environ.get('WRITE_RATE_PER_CLIENT', '0')),
+            write_burst_per_client=float(environ.get('WRITE_BURST_PER_CLIENT', '20')),
+            trust_forwarded_for=_flag(environ.get('TRUST_FORWARDED_FOR', 'false')),
+            smtp_server=environ.get('SMTP_SERVER', 'smtp.gmail.com'),
+            smtp_port=int(environ.get('SMTP_PORT', '587')),
+            smtp_email=environ.get('SMTP_EMAIL', ''),
+            smtp_password=environ.get('SMTP_PASSWORD', ''),
+            smtp_starttls=environ.get('SMTP_STARTTLS', 'true').lower() != 'false',
+            smtp_pool_size=int(environ.get('SMTP_POOL_SIZE', '2')),
+            email_workers=int(environ.get('EMAIL_WORKERS', '2')),
+            email_max_attempts=int(environ.get('EMAIL_MAX_ATTEMPTS', '5')),
+            pickup_slot_capacity=int(environ.get('PICKUP_SLOT_CAPACITY', '10')),
+            pickup_slot_minutes=int(environ.get('PICKUP_SLOT_MINUTES', '15')),
+            pickup_opens=time.fromisoformat(opens),
+            pickup_closes=time.fromisoformat(closes),
+            order_feed_change_stream=_flag(environ.get('ORDER_FEED_CHANGE_STREAM', 'false')),
+            menu_cache_ttl=float(environ.get('MENU_CACHE_TTL', '300')),
+            order_page_size=int(environ.get('ORDER_PAGE_SIZE', '100')),
+            order_changes_settle=float(environ.get('ORDER_CHANGES_SETTLE_SECONDS', '5')),
+            admin_stats_ttl=float(environ.get('ADMIN_STATS_TTL', '2')),
+        )
+
+    def __post_init__(self):
+        if self.reporting_read_preference not in READ_PREFERENCES:
+            raise ValueError(
+                f"Unknown REPORTING_READ_PREFERENCE {self.reporting_read_preference!r}; "
+                f"expected one of {', '.join(READ_PREFERENCES)}"
+            )
+        if self.reporting_max_staleness != -1 and self.reporting_max_staleness < 90:
+            raise ValueError("REPORTING_MAX_STALENESS_SECONDS must be -1 or at least 90")
+
+    def reporting_reads(self):
+        """Read preference for the reporting database handle"""
+        mode = READ_PREFERENCES[self.reporting_read_preference]
+        if mode is Primary:
+            return Primary()  # takes no staleness bound
+        return mode(max_staleness=self.reporting_max_staleness)
+
+    def motor_options(self) -> Dict[str, Any]:
+        """Pool and timeout keyword arguments for ``AsyncIOMotorClient``"""
+        options = {
+            "maxPoolSize": self.mongo_max_pool_size,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_time_ms,
+            "connectTimeoutMS": self.mongo_connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+            "socketTimeoutMS": self.mongo_socket_timeout_ms,
+            "waitQueueTimeoutMS": self.mongo_wait_queue_timeout_ms,
+        }
+        return {name: value for name, value in options.items() if value is not None}
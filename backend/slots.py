@@ -0,0 +1,136 @@
+"""Capacity-limited pickup slots.
+
+Pickup times are bucketed into fixed-length slots (e.g. 08:00-08:15) and
+each slot takes at most ``capacity`` orders. A slot's counter is one
+document in ``pickup_slots`` keyed by its start time, so reserving is a
+single conditional ``$inc`` on ``_id`` however many orders the slot
+already holds, and concurrent reservations can never push it over
+capacity. Pickup times are the shop's local wall-clock time; any UTC
+offset sent by the client is ignored.
+
+New orders can only book a slot that ``day()`` lists - starting between
+opening and closing - and that has not ended yet (``bookable_slot``).
+``slot_for`` itself only buckets, so orders placed earlier can still be
+released and counted by the prep list whenever they fall. Day listings are
+cached briefly and coalesced so a rush of customers opening the checkout
+costs one query per date per cache window.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ttl_cache import CoalescingTTLCache
+
+
+class SlotError(ValueError):
+    pass
+
+
+class PickupSlots:
+    def __init__(
+        self,
+        collection,
+        capacity: int = 10,
+        minutes: int = 15,
+        opens: time = time(7, 0),
+        closes: time = time(19, 0),
+        cache_ttl: float = 2.0,
+    ):
+        self.collection = collection
+        self.capacity = capacity
+        self.length = timedelta(minutes=minutes)
+        self.opens = opens
+        self.closes = closes
+        self._days = CoalescingTTLCache(ttl=cache_ttl)
+
+    @staticmethod
+    def key(slot: datetime) -> str:
+        return slot.strftime("%Y-%m-%dT%H:%M")
+
+    @staticmethod
+    def _parse(pickup_time: str) -> datetime:
+        try:
+            return datetime.fromisoformat(pickup_time).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            raise SlotError(f"Invalid pickup time {pickup_time!r}; expected an ISO date and time")
+
+    def _start(self, when: datetime) -> datetime:
+        midnight = datetime.combine(when.date(), time())
+        return midnight + (when - midnight) // self.length * self.length
+
+    def slot_for(self, pickup_time: str) -> datetime:
+        """Start of the slot containing ``pickup_time`` (ISO date and time)"""
+        return self._start(self._parse(pickup_time))
+
+    def bookable_slot(self, pickup_time: str, now: Optional[datetime] = None) -> datetime:
+        """Like ``slot_for``, but SlotError unless a new order may still pick up in that slot
+
+        ``now`` is the shop's local time, like pickup times.
+        """
+        slot = self.slot_for(pickup_time)
+        if not self.opens <= slot.time() < self.closes:
+            raise SlotError(
+                f"Pickup time {pickup_time} is outside opening hours "
+                f"({self.opens.strftime('%H:%M')}-{self.closes.strftime('%H:%M')})"
+            )
+        if slot + self.length <= (now or datetime.now()):
+            raise SlotError(f"Pickup time {pickup_time} has already passed")
+        return slot
+
+    async def _reserve(self, slot: datetime, count: int) -> bool:
+        query = {"_id": self.key(slot), "reserved": {"$lte": self.capacity - count}}
+        update = {"$inc": {"reserved": count}, "$setOnInsert": {"slot": slot}}
+        try:
+            await self.collection.update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            # The slot exists and lacks room, or a concurrent first
+            # reservation created it between our match and our insert
+            result = await self.collection.update_one(query, {"$inc": {"reserved": count}})
+            return result.modified_count == 1
+
+    async def reserve(self, slot: datetime, count: int = 1) -> int:
+        """Reserve up to ``count`` places in ``slot``; returns how many were granted"""
+        if count <= self.capacity and await self._reserve(slot, count):
+            granted = count
+        else:
+            # Not enough room for all of them: take what is left one by one
+            granted = 0
+            while count > 1 and granted < count and await self._reserve(slot, 1):
+                granted += 1
+        if granted:
+            self._days.invalidate(slot.date())
+        return granted
+
+    async def release(self, slot: datetime, count: int = 1) -> None:
+        # Orders placed before slots existed never reserved, so never go negative
+        await self.collection.update_one(
+            {"_id": self.key(slot), "reserved": {"$gte": count}}, {"$inc": {"reserved": -count}}
+        )
+        self._days.invalidate(slot.date())
+
+    async def day(self, day: date) -> List[Dict[str, Any]]:
+        """Every slot between opening and closing on ``day`` with its remaining capacity"""
+        return await self._days.get(day, lambda: self._load_day(day))
+
+    async def _load_day(self, day: date) -> List[Dict[str, Any]]:
+        start = datetime.combine(day, self.opens)
+        end = datetime.combine(day, self.closes)
+        reserved = {
+            doc["_id"]: doc["reserved"]
+            async for doc in self.collection.find({"_id": {"$gte": self.key(start), "$lt": self.key(end)}})
+        }
+        slots = []
+        slot = start
+        while slot < end:
+            taken = reserved.get(self.key(slot), 0)
+            slots.append({
+                "start": slot,
+                "end": slot + self.length,
+                "capacity": self.capacity,
+                "reserved": taken,
+                "remaining": max(self.capacity - taken, 0),
+            })
+            slot += self.length
+        return slots
@@ -0,0 +1,43 @@
+"""A small TTL cache that coalesces concurrent misses.
+
+While a value is being computed, every other caller asking for the same
+key awaits the same task instead of starting its own computation, so N
+admin tabs polling at once cost one backend query per TTL window.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class CoalescingTTLCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def invalidate(self, key: Hashable = None) -> None:
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._values.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute))
+            self._inflight[key] = task
+        # shield: one caller disconnecting must not cancel the shared computation
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            if self.ttl > 0:
+                self._values[key] = (time.monotonic(), value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
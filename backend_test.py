@@ -13,6 +13,11 @@ import uuid
 # Backend URL from frontend/.env
 BACKEND_URL = "https://0501cdf5-a7c1-4cac-9de9-dc190f7ce216.preview.emergentagent.com/api"
 
+def with_menu_ids(items):
+    """Orders are priced from the menu, so cart lines must use real menu item ids"""
+    menu = {item['name']: item['id'] for item in requests.get(f"{BACKEND_URL}/menu").json()}
+    return [{**item, "id": menu.get(item['name'], item['id'])} for item in items]
+
 def test_api_root():
     """Test the root API endpoint"""
     print("🧪 Testing API Root Endpoint...")
@@ -136,7 +141,7 @@ def test_create_order():
         "customer_phone": "555-0198",
         "pickup_time": (datetime.now() + timedelta(hours=2)).isoformat(),
         "special_requests": "Please make the croissants extra flaky and warm",
-        "total_amount": 15.25,
+        "total_amount": 15.75,
         "items": [
             {
                 "id": "item1",
@@ -163,6 +168,7 @@ def test_create_order():
     }
     
     try:
+        order_data["items"] = with_menu_ids(order_data["items"])
         response = requests.post(f"{BACKEND_URL}/orders", json=order_data)
         print(f"Status Code: {response.status_code}")
         
@@ -325,6 +331,7 @@ def create_additional_test_orders():
     created_orders = 0
     for order_data in test_orders:
         try:
+            order_data["items"] = with_menu_ids(order_data["items"])
             response = requests.post(f"{BACKEND_URL}/orders", json=order_data)
             if response.status_code == 200:
                 created_orders += 1
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Admin stats benchmark
+Compares latency percentiles of GET /api/admin/stats computed the old way
+(four sequential queries over orders), the new way (rollups + recent
+orders fetched concurrently) and through the coalescing TTL cache with
+concurrent dashboard polls.
+
+Seeds a scratch database on the MongoDB from backend/.env and drops it
+afterwards:
+    python benchmarks/admin_stats_bench.py --orders 20000 --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+async def legacy_admin_stats(db):
+    """The pre-rollup implementation: four sequential round-trips"""
+    total_orders = await db.orders.count_documents({})
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_orders = await db.orders.count_documents({"order_date": {"$gte": today}})
+    pipeline = [
+        {"$match": {"order_date": {"$gte": today}}},
+        {"$group": {"_id": None, "total": {"$sum": "$total_amount"}}}
+    ]
+    result = await db.orders.aggregate(pipeline).to_list(1)
+    recent = await db.orders.find().sort("order_date", -1).limit(5).to_list(5)
+    return total_orders, today_orders, result, recent
+
+
+def make_orders(count):
+    now = datetime.utcnow()
+    names = ["Artisan Croissants", "Signature Latte", "Pain au Chocolat", "Cappuccino", "Cinnamon Danish"]
+    for i in range(count):
+        items = [
+            {"id": str(n), "name": name, "price": 4.0, "quantity": random.randint(1, 3), "category": "bakery"}
+            for n, name in enumerate(random.sample(names, 2))
+        ]
+        yield {
+            "id": f"bench-{i}",
+            "customer_name": "Bench Customer",
+            "customer_email": "bench@example.com",
+            "customer_phone": "555-0100",
+            "items": items,
+            "total_amount": sum(item["price"] * item["quantity"] for item in items),
+            "pickup_time": "08:00",
+            "special_requests": "",
+            "order_date": now - timedelta(minutes=i * 7),
+            "status": "pending",
+        }
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+async def measure(fn, total, concurrency):
+    samples = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return percentiles(samples)
+
+
+async def main(args):
+    import server
+    import services
+    from admin_api import compute_admin_stats, get_admin_stats
+    from bootstrap import bootstrap
+
+    server.create_app()  # configures services
+    db = services.db
+    await bootstrap(db, [])
+    orders = list(make_orders(args.orders))
+    for start in range(0, len(orders), 5000):
+        await db.orders.insert_many(orders[start:start + 5000])
+    await services.sales_rollups.rebuild(db.orders)
+
+    services.admin_stats_cache.ttl = 0.5
+    results = [
+        ("old: 4 sequential queries", await measure(lambda: legacy_admin_stats(db), args.requests, args.concurrency)),
+        ("new: rollups + gather", await measure(compute_admin_stats, args.requests, args.concurrency)),
+        ("new: with coalescing cache", await measure(get_admin_stats, args.requests, args.concurrency)),
+    ]
+
+    print(f"GET /api/admin/stats  ({args.orders} orders, {args.requests} requests, concurrency {args.concurrency})")
+    print(f"  {'path':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, (p50, p95, p99) in results:
+        print(f"  {name:<30} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+
+    if not args.keep:
+        await services.client.drop_database(os.environ['DB_NAME'])
+    services.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--db", default="bakery_bench", help="scratch database name")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    args = parser.parse_args()
+    os.environ['DB_NAME'] = args.db  # before server.py reads it
+    asyncio.run(main(args))
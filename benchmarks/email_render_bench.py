@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Confirmation email render benchmark
+Times rendering the subject, text and HTML bodies of orders with 1, 10 and
+100 items through email_templates, against the f-string builder with +=
+per item that it replaced (kept below as render_legacy).
+
+No database or SMTP server needed:
+    python benchmarks/email_render_bench.py --orders 2000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from email_templates import confirmation_templates  # noqa: E402
+
+
+def render_legacy(order):
+    """The builder the templates replaced: nested f-strings and += per item, no escaping"""
+    subject = f"Order Confirmation - Artisan Bakery & Café (#{order.id[:8]})"
+
+    # Create HTML email template
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #fef3c7; }}
+            .container {{ max-width: 600px; margin: 0 auto; background: white; border-radius: 10px; overflow: hidden; }}
+            .header {{ background: linear-gradient(135deg, #f59e0b, #d97706); color: white; padding: 30px; text-align: center; }}
+            .content {{ padding: 30px; }}
+            .order-details {{ background: #f9fafb; padding: 20px; border-radius: 8px; margin: 20px 0; }}
+            .items-table {{ width: 100%; border-collapse: collapse; margin: 15px 0; }}
+            .items-table th, .items-table td {{ padding: 10px; text-align: left; border-bottom: 1px solid #e5e7eb; }}
+            .items-table th {{ background: #f3f4f6; font-weight: bold; }}
+            .total {{ font-size: 18px; font-weight: bold; color: #f59e0b; }}
+            .footer {{ background: #f3f4f6; padding: 20px; text-align: center; color: #6b7280; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🥐 Artisan Bakery & Café</h1>
+                <h2>Order Confirmation</h2>
+            </div>
+
+            <div class="content">
+                <p>Dear {order.customer_name},</p>
+
+                <p>Thank you for your order! We're excited to prepare your delicious items. Here are your order details:</p>
+
+                <div class="order-details">
+                    <h3>📋 Order Information</h3>
+                    <p><strong>Order ID:</strong> #{order.id[:8]}</p>
+                    <p><strong>Customer:</strong> {order.customer_name}</p>
+                    <p><strong>Phone:</strong> {order.customer_phone}</p>
+                    <p><strong>Pickup Time:</strong> {order.pickup_time}</p>
+                    <p><strong>Order Date:</strong> {order.order_date.strftime('%B %d, %Y at %I:%M %p')}</p>
+                    {f'<p><strong>Special Requests:</strong> {order.special_requests}</p>' if order.special_requests else ''}
+                </div>
+
+                <h3>🛒 Your Items</h3>
+                <table class="items-table">
+                    <thead>
+                        <tr>
+                            <th>Item</th>
+                            <th>Quantity</th>
+                            <th>Price</th>
+                            <th>Total</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+    """
+
+    for item in order.items:
+        html_content += f"""
+                        <tr>
+                            <td>{item.name}</td>
+                            <td>{item.quantity}</td>
+                            <td>${item.price:.2f}</td>
+                            <td>${item.price * item.quantity:.2f}</td>
+                        </tr>
+        """
+
+    html_content += f"""
+                    </tbody>
+                    <tfoot>
+                        <tr>
+                            <td colspan="3" class="total">Total Amount:</td>
+                            <td class="total">${order.total_amount:.2f}</td>
+                        </tr>
+                    </tfoot>
+                </table>
+
+                <p>🕒 <strong>Pickup Instructions:</strong></p>
+                <ul>
+                    <li>Please arrive at your scheduled pickup time: <strong>{order.pickup_time}</strong></li>
+                    <li>Have your order ID ready: <strong>#{order.id[:8]}</strong></li>
+                    <li>Payment can be made at pickup (cash or card)</li>
+                </ul>
+
+                <p>We'll have your fresh items ready exactly when you need them. Thank you for choosing Artisan Bakery & Café!</p>
+            </div>
+
+            <div class="footer">
+                <p>🏪 Artisan Bakery & Café</p>
+                <p>Fresh baked goods and specialty coffee crafted with passion</p>
+                <p>Questions? Reply to this email or call us!</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    # Create plain text version
+    text_content = f"""
+    Order Confirmation - Artisan Bakery & Café
+
+    Dear {order.customer_name},
+
+    Thank you for your order! Here are your order details:
+
+    Order ID: #{order.id[:8]}
+    Customer: {order.customer_name}
+    Phone: {order.customer_phone}
+    Pickup Time: {order.pickup_time}
+    Order Date: {order.order_date.strftime('%B %d, %Y at %I:%M %p')}
+    {f'Special Requests: {order.special_requests}' if order.special_requests else ''}
+
+    YOUR ITEMS:
+    """
+
+    for item in order.items:
+        text_content += f"- {item.name} x{item.quantity} = ${item.price * item.quantity:.2f}\n"
+
+    text_content += f"""
+
+    TOTAL: ${order.total_amount:.2f}
+
+    Please arrive at your scheduled pickup time with your order ID.
+
+    Thank you for choosing Artisan Bakery & Café!
+    """
+
+    return subject, text_content, html_content
+
+
+def make_order(item_count):
+    items = [
+        SimpleNamespace(name=f"Artisan Croissant {i}", quantity=i % 3 + 1, price=3.5)
+        for i in range(item_count)
+    ]
+    return SimpleNamespace(
+        id=str(uuid.uuid4()),
+        customer_name="Marie Dubois",
+        customer_email="marie@example.com",
+        customer_phone="+33 1 23 45 67 89",
+        items=items,
+        total_amount=sum(item.price * item.quantity for item in items),
+        pickup_time="08:30",
+        special_requests="Extra flaky, please",
+        order_date=datetime.utcnow(),
+    )
+
+
+def best_of(repeat, fn):
+    """Fastest of `repeat` timed runs of fn(), in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    print(f"Confirmation email render ({args.orders} orders per size, best of {args.repeat})")
+    print(f"  {'items':>5}  {'legacy µs/order':>16}  {'templates µs/order':>19}  {'speedup':>8}")
+    for item_count in (1, 10, 100):
+        orders = [make_order(item_count) for _ in range(args.orders)]
+
+        legacy = best_of(args.repeat, lambda: [render_legacy(o) for o in orders])
+        templates = best_of(args.repeat, lambda: [confirmation_templates.render(o) for o in orders])
+        legacy, templates = legacy / len(orders) * 1e6, templates / len(orders) * 1e6
+
+        print(f"  {item_count:>5}  {legacy:>16.1f}  {templates:>19.1f}  {legacy / templates:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Demand forecast accumulation benchmark
+Feeds synthetic order lines, chunk by chunk, through a plain Python dict
+loop (one datetime parse and dict update per line) and through the
+vectorized DemandAccumulator, reporting lines per second and peak traced
+memory for each. Only the CPU side is measured; rows are generated in
+memory in the shape the aggregation pipeline yields.
+
+    python benchmarks/forecast_bench.py --lines 1000000 --chunk-size 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from forecast import DemandAccumulator  # noqa: E402
+
+ITEMS = [f"Item {n}" for n in range(40)]
+
+
+def make_chunks(lines, chunk_size, end, weeks, seed=7):
+    rng = random.Random(seed)
+    span = weeks * 7 * 24 * 60
+    chunk = []
+    for _ in range(lines):
+        order_date = end - timedelta(minutes=rng.randrange(span))
+        pickup = order_date + timedelta(hours=rng.randrange(1, 48))
+        chunk.append({
+            "d": order_date,
+            "p": pickup.strftime("%Y-%m-%dT%H:%M") if rng.random() > 0.05 else "ASAP",
+            "n": rng.choice(ITEMS),
+            "q": rng.randint(1, 4),
+        })
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class PythonAccumulator:
+    """The per-line loop the forecast would need without numpy"""
+
+    def __init__(self, end, weeks=52, half_life=8.0):
+        self.end = end
+        self.weeks = weeks
+        self.decay = 0.5 ** (1 / half_life)
+        self.sums = defaultdict(float)
+
+    def add(self, rows):
+        for row in rows:
+            try:
+                when = datetime.strptime(row["p"][:16], "%Y-%m-%dT%H:%M")
+            except ValueError:
+                when = row["d"]
+            age = (self.end - when) // timedelta(weeks=1)
+            if 0 <= age < self.weeks:
+                self.sums[row["n"], when.weekday(), when.hour] += row["q"] * self.decay ** age
+
+
+def measure(make_accumulator, args, end):
+    accumulator = make_accumulator()
+    elapsed = 0.0
+    for chunk in make_chunks(args.lines, args.chunk_size, end, args.weeks):
+        start = time.perf_counter()
+        accumulator.add(chunk)
+        elapsed += time.perf_counter() - start
+
+    # Memory in a second pass: tracemalloc slows allocation-heavy code down
+    accumulator = make_accumulator()
+    tracemalloc.start()
+    for chunk in make_chunks(args.lines, args.chunk_size, end, args.weeks):
+        accumulator.add(chunk)
+    # Includes the chunk being built, which both paths hold alike
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return args.lines / elapsed, peak / 2**20
+
+
+def main(args):
+    end = datetime(2026, 1, 5)
+    results = []
+    if not args.skip_python:
+        results.append(("old: python dict loop", measure(lambda: PythonAccumulator(end, args.weeks), args, end)))
+    results.append(("new: pandas + bincount", measure(lambda: DemandAccumulator(end, args.weeks), args, end)))
+
+    print(f"Forecast accumulation  ({args.lines} lines, chunks of {args.chunk_size}, {args.weeks} weeks)")
+    print(f"  {'path':<26} {'lines/s':>12} {'peak MiB':>9}")
+    for name, (rate, peak) in results:
+        print(f"  {name:<26} {rate:>12,.0f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--skip-python", action="store_true", help="only run the vectorized path")
+    main(parser.parse_args())
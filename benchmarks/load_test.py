@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for the bakery API
+Drives concurrent load at every main route and reports req/s and
+p50/p95/p99 latency per route. Results are written as JSON; pass a
+previous result as --baseline to flag regressions.
+
+By default the app from backend/server.py runs in-process against a
+scratch database on the MongoDB from backend/.env (dropped afterwards).
+--in-memory swaps Motor for mongomock-motor so no MongoDB is needed, and
+--url points the harness at an already running server instead:
+
+    python benchmarks/load_test.py --requests 500 --concurrency 20
+    python benchmarks/load_test.py --in-memory --baseline benchmarks/results/latest.json
+    python benchmarks/load_test.py --url http://localhost:8001 --seed-orders 0
+
+Every request comes from one client, so the in-process app runs without
+the per-client write rate limit; a --url server should leave
+WRITE_RATE_PER_CLIENT at 0 (the default) to measure the same thing.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+
+import httpx  # noqa: E402
+
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+# Cart lines for generated orders; filled from /api/menu since orders must
+# reference real menu item ids
+CART = []
+
+
+def pickup_time():
+    """A random 15-minute slot in the coming year, so slot capacity is not the bottleneck"""
+    start = datetime.combine(date.today(), datetime.min.time()) + timedelta(days=1, hours=7)
+    return (start + timedelta(days=random.randrange(365), minutes=15 * random.randrange(48))).isoformat()
+
+
+def order_payload(key=None):
+    payload = {
+        "customer_name": "Load Test",
+        "customer_email": "loadtest@example.com",
+        "customer_phone": "555-0100",
+        "items": CART,
+        "total_amount": sum(item["price"] * item["quantity"] for item in CART),
+        "pickup_time": pickup_time(),
+        "special_requests": "",
+    }
+    if key is not None:
+        payload["idempotency_key"] = key
+    return payload
+
+
+# name -> (method, path, body factory)
+ROUTES = {
+    "GET /menu": ("GET", "/api/menu", None),
+    "GET /menu/bakery": ("GET", "/api/menu/bakery", None),
+    "GET /menu/search": ("GET", "/api/menu/search?q=choc&exclude_ingredients=egg", None),
+    "POST /orders": ("POST", "/api/orders", order_payload),
+    "GET /orders": ("GET", "/api/orders", None),
+    "GET /slots": ("GET", f"/api/slots?date={date.today()}", None),
+    "GET /analytics": ("GET", "/api/analytics", None),
+    "GET /analytics/revenue": ("GET", "/api/analytics/revenue?bucket=hour", None),
+    "GET /admin/stats": ("GET", "/api/admin/stats", None),
+    "GET /admin/orders/export": ("GET", "/api/admin/orders/export", None),
+    "GET /admin/orders/changes": (
+        "GET", f"/api/admin/orders/changes?since={(datetime.utcnow() - timedelta(hours=1)):%Y-%m-%dT%H:%M:%S}", None,
+    ),
+}
+
+
+async def seed_orders(client, count):
+    """Create `count` orders through the batch endpoint"""
+    for start in range(0, count, 100):
+        batch = [order_payload(f"seed-{uuid.uuid4()}") for _ in range(min(100, count - start))]
+        response = await client.post("/api/orders/batch", json={"orders": batch})
+        response.raise_for_status()
+
+
+async def drive(client, method, path, body, total, concurrency):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body() if body else None)
+                await response.aread()
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Print per-route deltas against a baseline; returns the regressed routes"""
+    regressed = []
+    print(f"\nAgainst baseline {baseline['timestamp']}:")
+    for name, current in results["routes"].items():
+        previous = baseline["routes"].get(name)
+        if not previous:
+            continue
+        p95_delta = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100 if previous["p95_ms"] else 0
+        rps_delta = (current["rps"] - previous["rps"]) / previous["rps"] * 100 if previous["rps"] else 0
+        flag = ""
+        if p95_delta > max_regression or -rps_delta > max_regression:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"  {name:<26} p95 {p95_delta:+7.1f}%   req/s {rps_delta:+7.1f}%{flag}")
+    return regressed
+
+
+async def load_cart(client):
+    menu = (await client.get("/api/menu")).raise_for_status().json()
+    for category in ("bakery", "cafe"):
+        item = next(item for item in menu if item["category"] == category and item["available"])
+        CART.append({key: item[key] for key in ("id", "name", "price", "category")} | {"quantity": 1})
+
+
+async def run(args, client):
+    await load_cart(client)
+    if args.seed_orders:
+        await seed_orders(client, args.seed_orders)
+
+    routes = {}
+    for name, (method, path, body) in ROUTES.items():
+        if args.routes and name not in args.routes:
+            continue
+        routes[name] = await drive(client, method, path, body, args.requests, args.concurrency)
+
+    print(f"{'route':<28} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in routes.items():
+        print(f"{name:<28} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "config": {
+            "target": args.url or ("in-memory" if args.in_memory else "mongodb"),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_orders": args.seed_orders,
+        },
+        "routes": routes,
+    }
+
+
+async def main(args):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            return await run(args, client)
+
+    if args.in_memory:
+        try:
+            import mongomock_motor
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor: pip install mongomock-motor")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    os.environ['DB_NAME'] = args.db  # before server.py reads it
+    os.environ.setdefault('WRITE_RATE_PER_CLIENT', '0')
+
+    import server
+    import services
+
+    # Unhandled exceptions become 500s and count as errors, as behind uvicorn
+    # (e.g. $dateTrunc, which mongomock lacks, in --in-memory mode)
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    try:
+        async with server.lifespan(server.app), httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=60
+        ) as client:
+            return await run(args, client)
+    finally:
+        if not args.in_memory and not args.keep:
+            drop = services.AsyncIOMotorClient(os.environ['MONGO_URL'])
+            await drop.drop_database(args.db)
+            drop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed-orders", type=int, default=1000)
+    parser.add_argument("--routes", nargs="*", choices=list(ROUTES), help="only these routes")
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MongoDB")
+    parser.add_argument("--db", default="bakery_loadtest", help="scratch database name")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--output", type=Path, help="result file (default: results/<timestamp>.json and results/latest.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier result to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="allowed p95/req/s change in %%")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+
+    body = json.dumps(results, indent=2)
+    if args.output:
+        output = args.output
+        output.write_text(body)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{results['timestamp'].replace(':', '')}.json"
+        output.write_text(body)
+        (RESULTS_DIR / "latest.json").write_text(body)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        if compare(results, json.loads(args.baseline.read_text()), args.max_regression):
+            sys.exit(1)
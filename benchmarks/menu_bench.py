@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Menu endpoint benchmark
+Measures requests/sec for GET /api/menu with the menu cache disabled
+(the old per-request count + find + model rebuild), with the cache warm,
+and with conditional requests answered by 304.
+
+Runs the app in-process against the MongoDB configured in backend/.env:
+    python benchmarks/menu_bench.py --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+import services  # noqa: E402
+
+
+async def run(client, path, total, concurrency, headers=None):
+    """Fire `total` GETs at `path` with `concurrency` workers, return req/s"""
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path, headers=headers)
+            assert response.status_code in (200, 304), response.status_code
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.lifespan(server.app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        ttl = services.menu_cache.ttl
+
+        services.menu_cache.ttl = 0
+        before = await run(client, "/api/menu", args.requests, args.concurrency)
+
+        services.menu_cache.ttl = ttl
+        services.menu_cache.invalidate()
+        etag = (await client.get("/api/menu")).headers["etag"]
+        after = await run(client, "/api/menu", args.requests, args.concurrency)
+        revalidated = await run(
+            client, "/api/menu", args.requests, args.concurrency, headers={"If-None-Match": etag}
+        )
+
+    print(f"GET /api/menu  ({args.requests} requests, concurrency {args.concurrency})")
+    print(f"  uncached:        {before:10.1f} req/s")
+    print(f"  cached:          {after:10.1f} req/s  ({after / before:.1f}x)")
+    print(f"  If-None-Match:   {revalidated:10.1f} req/s  ({revalidated / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Order list serialization benchmark
+Measures CPU time per request for returning 100, 1k and 10k orders the
+old way (Order(**doc) in the handler, then FastAPI's response_model
+validation and jsonable_encoder) and the new way (one validation through
+a TypeAdapter, serialized by pydantic-core in TypedJSONResponse).
+
+Documents are served from memory so only the Python side is measured:
+    python benchmarks/order_list_bench.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from models import ORDER_LIST, Order  # noqa: E402
+from responses import TypedJSONResponse  # noqa: E402
+
+
+def make_documents(count):
+    now = datetime.utcnow()
+    items = [
+        {"id": str(uuid.uuid4()), "name": "Artisan Croissants", "price": 3.5, "quantity": 2, "category": "bakery"},
+        {"id": str(uuid.uuid4()), "name": "Signature Latte", "price": 4.5, "quantity": 1, "category": "cafe"},
+    ]
+    return [
+        {
+            "_id": str(uuid.uuid4()),
+            "id": str(uuid.uuid4()),
+            "customer_name": "Marie Dubois",
+            "customer_email": "marie@example.com",
+            "customer_phone": "555-0100",
+            "items": items,
+            "total_amount": 11.5,
+            "pickup_time": "08:30",
+            "special_requests": "",
+            "order_date": now - timedelta(minutes=i),
+            "status": "pending",
+        }
+        for i in range(count)
+    ]
+
+
+def make_app(documents):
+    app = FastAPI()
+    projected = [{k: v for k, v in doc.items() if k != "_id"} for doc in documents]
+
+    @app.get("/old", response_model=List[Order])
+    async def old():
+        return [Order(**doc) for doc in documents]
+
+    @app.get("/new", response_model=List[Order])
+    async def new():
+        return TypedJSONResponse(ORDER_LIST.validate_python(projected), ORDER_LIST)
+
+    return app
+
+
+async def cpu_per_request(client, path, requests):
+    await client.get(path)  # warm up
+    start = time.process_time()
+    for _ in range(requests):
+        response = await client.get(path)
+        assert response.status_code == 200
+    return (time.process_time() - start) / requests * 1000
+
+
+async def main(args):
+    print("Order list CPU per request (ms)")
+    print(f"  {'orders':>7} {'old':>10} {'new':>10} {'speedup':>8}")
+    for count in (100, 1000, 10000):
+        requests = max(3, args.budget // count)
+        transport = httpx.ASGITransport(app=make_app(make_documents(count)))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            old = await cpu_per_request(client, "/old", requests)
+            new = await cpu_per_request(client, "/new", requests)
+        print(f"  {count:>7} {old:>10.2f} {new:>10.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=int, default=50000, help="orders serialized per size and path")
+    asyncio.run(main(parser.parse_args()))
@@ -1133,12 +1133,55 @@ const Bakery = () => {
 // Admin Panel Component
 const AdminPanel = () => {
   const [orders, setOrders] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [stats, setStats] = useState({});
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('dashboard');
 
   useEffect(() => {
     fetchAdminData();
+
+    // New orders are pushed by the server instead of polling
+    const feed = new EventSource(`${API}/admin/orders/feed`);
+    let reconnecting = false;
+    feed.addEventListener('order', (event) => {
+      const { order, stats: delta } = JSON.parse(event.data);
+      setOrders((current) => [order, ...current]);
+      setStats((current) => ({
+        ...current,
+        total_orders: (current.total_orders || 0) + delta.total_orders,
+        today_orders: (current.today_orders || 0) + delta.today_orders,
+        today_revenue: (current.today_revenue || 0) + delta.today_revenue,
+        recent_orders: [order, ...(current.recent_orders || [])].slice(0, 5)
+      }));
+    });
+    feed.addEventListener('status', (event) => {
+      // A cancellation comes with what it takes off the counters
+      const { id, status, stats: delta } = JSON.parse(event.data);
+      const update = (list) => list.map((order) => (order.id === id ? { ...order, status } : order));
+      setOrders(update);
+      setStats((current) => ({
+        ...current,
+        ...(status === 'cancelled' && delta && {
+          total_orders: (current.total_orders || 0) + delta.total_orders,
+          today_orders: (current.today_orders || 0) + delta.today_orders,
+          today_revenue: (current.today_revenue || 0) + delta.today_revenue
+        }),
+        recent_orders: update(current.recent_orders || [])
+      }));
+    });
+    // The server dropped us for falling behind; reload once reconnected
+    feed.addEventListener('resync', () => { reconnecting = true; });
+    feed.onerror = () => { reconnecting = true; };
+    feed.onopen = () => {
+      // Orders created while disconnected were missed
+      if (reconnecting) {
+        reconnecting = false;
+        fetchAdminData();
+      }
+    };
+    return () => feed.close();
   }, []);
 
   const fetchAdminData = async () => {
@@ -1150,6 +1193,7 @@ const AdminPanel = () => {
       
       if (ordersResponse.ok && statsResponse.ok) {
         setOrders(await ordersResponse.json());
+        setNextCursor(ordersResponse.headers.get('X-Next-Cursor'));
         setStats(await statsResponse.json());
       }
     } catch (error) {
@@ -1159,6 +1203,26 @@ const AdminPanel = () => {
     }
   };
 
+  // Orders come a page at a time; the next page's token is in X-Next-Cursor
+  const loadMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await fetch(`${API}/admin/orders?cursor=${encodeURIComponent(nextCursor)}`);
+      if (response.ok) {
+        const page = await response.json();
+        setOrders((current) => {
+          const shown = new Set(current.map((order) => order.id));
+          return [...current, ...page.filter((order) => !shown.has(order.id))];
+        });
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      console.error('Error loading more orders:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleExportCSV = async () => {
     try {
       const response = await fetch(`${API}/admin/orders/export`);
@@ -1318,7 +1382,7 @@ const AdminPanel = () => {
         {activeTab === 'orders' && (
           <div className="bg-white rounded-2xl shadow-lg p-6">
             <div className="flex justify-between items-center mb-6">
-              <h2 className="text-xl font-bold text-gray-800">All Orders ({orders.length})</h2>
+              <h2 className="text-xl font-bold text-gray-800">All Orders ({orders.length}{nextCursor ? '+' : ''})</h2>
               <button
                 onClick={handleExportCSV}
                 className="bg-amber-500 text-white px-4 py-2 rounded-lg font-medium hover:bg-amber-600 transition-colors flex items-center space-x-2"
@@ -1382,6 +1446,18 @@ const AdminPanel = () => {
                 </motion.div>
               ))}
             </div>
+
+            {nextCursor && (
+              <div className="mt-6 text-center">
+                <button
+                  onClick={loadMoreOrders}
+                  disabled={loadingMore}
+                  className="border border-amber-500 text-amber-600 px-4 py-2 rounded-lg font-medium hover:bg-amber-50 transition-colors disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more orders'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -1454,6 +1530,10 @@ const Checkout = () => {
           setOrderDetails(order);
           setOrderSubmitted(true);
           clearCart();
+        } else {
+          // e.g. the pickup slot is full or an item is no longer available
+          const { detail } = await response.json();
+          alert(Array.isArray(detail) ? detail.map(d => d.msg || d).join('\n') : detail);
         }
       } else {
         // Store offline order
@@ -0,0 +1,43 @@
+import contextlib
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# The backend is run as `uvicorn server:app` from backend/, so its modules
+# import each other by bare name.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')  # server.py builds an app at import
+os.environ.setdefault('DB_NAME', 'bakery_test')
+
+
+@pytest.fixture
+def in_memory_api(monkeypatch):
+    """``async with in_memory_api(**settings) as client`` serves a fresh app on mongomock-motor
+
+    The lifespan runs, so the menu is seeded and the rollups built.
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import httpx
+    import server
+    import services
+    from settings import Settings
+
+    monkeypatch.setattr(services, "AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient)
+
+    @contextlib.asynccontextmanager
+    async def serve(**overrides):
+        settings = {
+            "mongo_url": "mongodb://localhost:27017",
+            "db_name": f"bakery_{uuid.uuid4().hex[:8]}",
+            **overrides,
+        }
+        app = server.create_app(Settings(**settings))
+        transport = httpx.ASGITransport(app=app)
+        async with server.lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+    return serve
@@ -0,0 +1,136 @@
+"""Write admission: per-client token buckets and a bounded queue for in-flight writes"""
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+import services
+from admission import QUEUE_FULL, QUEUE_TIMEOUT, RATE_LIMITED, AdmissionControl, ConcurrencyLimiter, Rejected, TokenBuckets
+from api_common import client_key
+from settings import Settings
+
+
+def test_token_buckets():
+    buckets = TokenBuckets(rate=2.0, burst=2.0)
+    assert [buckets.take("a", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.5]
+    assert buckets.take("b", now=0.0) == 0.0  # every client has its own bucket
+    assert buckets.take("a", now=0.25) == pytest.approx(0.25)
+    assert buckets.take("a", now=0.5) == 0.0
+    assert buckets.take("a", now=10.0) == 0.0  # refilled, but only up to the burst
+    assert buckets.take("a", now=10.0) == 0.0
+    assert buckets.take("a", now=10.0) == 0.5
+
+
+def test_token_buckets_forget_the_least_recent_client():
+    buckets = TokenBuckets(rate=1.0, burst=1.0, max_clients=2)
+    for key in ("a", "b", "c"):
+        buckets.take(key, now=0.0)
+    assert buckets.take("c", now=0.0) == 1.0
+    assert buckets.take("a", now=0.0) == 0.0
+
+
+def test_rate_zero_disables_the_buckets():
+    buckets = TokenBuckets(rate=0.0, burst=1.0)
+    assert [buckets.take("a", now=0.0) for _ in range(100)] == [0.0] * 100
+    assert AdmissionControl().buckets.rate == 0.0
+    assert Settings(mongo_url="mongodb://localhost", db_name="x").write_rate_per_client == 0.0
+
+
+def test_rate_limited_client_is_told_when_to_retry():
+    async def run():
+        admission = AdmissionControl(rate=0.4, burst=1.0)
+        async with admission.admit("a"):
+            pass
+        with pytest.raises(Rejected) as rejected:
+            async with admission.admit("a"):
+                pass
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    assert (rejected.status_code, rejected.reason, rejected.retry_after) == (429, RATE_LIMITED, 3)
+
+
+def test_concurrency_limiter_queues_then_sheds():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+        release = asyncio.Event()
+        outcomes = []
+
+        async def write(name):
+            try:
+                async with limiter.slot():
+                    outcomes.append((name, "admitted"))
+                    await release.wait()
+            except Rejected as e:
+                outcomes.append((name, e.status_code, e.reason, e.retry_after))
+
+        first = asyncio.create_task(write("first"))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(write("queued"))
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        await write("over the queue")
+        await queued  # times out waiting for the first
+        release.set()
+        await first
+        await write("after")  # the slot was given back
+        return outcomes, limiter.queued
+
+    outcomes, queued = asyncio.run(run())
+    assert outcomes == [
+        ("first", "admitted"),
+        ("over the queue", 503, QUEUE_FULL, 1),
+        ("queued", 503, QUEUE_TIMEOUT, 1),
+        ("after", "admitted"),
+    ]
+    assert queued == 0
+
+
+def test_queued_write_gets_the_freed_slot():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=1.0)
+        order = []
+
+        async def write(name, hold):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        await asyncio.gather(write("first", 0.01), write("second", 0))
+        return order
+
+    assert asyncio.run(run()) == ["first", "second"]
+
+
+def request(forwarded_for=None):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 4000)})
+
+
+def test_client_key_behind_a_proxy(monkeypatch):
+    monkeypatch.setattr(services, "settings", Settings(mongo_url="mongodb://localhost", db_name="x"), raising=False)
+    assert client_key(request("203.0.113.9")) == "10.0.0.1"
+
+    monkeypatch.setattr(services, "settings", Settings(mongo_url="mongodb://localhost", db_name="x", trust_forwarded_for=True))
+    # The client may send its own X-Forwarded-For; the proxy appends the real address
+    assert client_key(request("1.2.3.4, 203.0.113.9")) == "203.0.113.9"
+    assert client_key(request()) == "10.0.0.1"
+
+
+def test_rate_limited_write_gets_retry_after(in_memory_api):
+    async def run():
+        async with in_memory_api(write_rate_per_client=0.5, write_burst_per_client=1) as client:
+            menu = (await client.get("/api/menu")).json()
+            order = {
+                "customer_name": "Ada",
+                "customer_email": "ada@example.test",
+                "customer_phone": "555-0100",
+                "items": [{**menu[0], "quantity": 1}],
+                "total_amount": 0,
+                "pickup_time": "2030-01-07T09:00",
+            }
+            return [await client.post("/api/orders", json=order) for _ in range(2)]
+
+    placed, refused = asyncio.run(run())
+    assert placed.status_code == 200
+    assert (refused.status_code, refused.headers["Retry-After"]) == (429, "2")
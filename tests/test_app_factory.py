@@ -0,0 +1,23 @@
+"""create_app can run again, e.g. under uvicorn --factory, without leaking the previous Mongo pool"""
+import pytest
+
+import server
+import services
+from settings import Settings
+
+
+def test_second_app_closes_the_first_apps_client(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    closed = []
+
+    class Client(mongomock_motor.AsyncMongoMockClient):
+        def close(self):
+            closed.append(self)
+
+    monkeypatch.setattr(services, "AsyncIOMotorClient", Client)
+    settings = Settings(mongo_url="mongodb://localhost:27017", db_name="factory_test")
+    server.create_app(settings)
+    first = services.client
+    server.create_app(settings)
+    assert closed == [first]
+    assert services.client is not first
@@ -0,0 +1,93 @@
+"""A freshly started worker imports only what serving needs.
+
+Each check runs a new interpreter with ``python -X importtime``, imports
+server (which builds the app) and sends GET /api/health straight to the
+ASGI app; the lifespan's MongoDB work is not part of the measurement.
+Most of the time is FastAPI, pydantic and motor; the budget is there to
+catch a heavy import slipping back onto the startup path. Override it on
+slow machines with COLD_START_BUDGET_MS.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", "1500"))
+RUNS = 3
+
+# Loaded on first use by the email, export, forecast and bootstrap paths
+LAZY_MODULES = (
+    "smtplib",
+    "email.mime.multipart",
+    "email_templates",
+    "order_export",
+    "forecast",
+    "pandas",
+    "numpy",
+    "boto3",
+    "sample_menu",
+)
+
+FIRST_REQUEST = """
+import asyncio
+import time
+
+started = time.perf_counter()
+import server
+
+
+async def first_request():
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/health", "raw_path": b"/api/health", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await server.app(scope, receive, send)
+    return messages[0]["status"]
+
+
+status = asyncio.run(first_request())
+print(status, (time.perf_counter() - started) * 1000)
+"""
+
+
+def cold_start() -> Tuple[int, float, Dict[str, int]]:
+    """Status and milliseconds to the first response, and cumulative import time (µs) per module"""
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "bakery_test")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", FIRST_REQUEST],
+        cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60, check=True,
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                imports[name.strip()] = int(cumulative)
+    status, elapsed = result.stdout.split()
+    return int(status), float(elapsed), imports
+
+
+def test_rarely_used_subsystems_load_lazily():
+    status, _, imports = cold_start()
+    assert status == 200
+    assert "server" in imports
+    assert [name for name in LAZY_MODULES if name in imports] == []
+
+
+def test_time_to_first_request():
+    # The best of a few runs, so one slow run on a busy machine does not fail it
+    elapsed = min(cold_start()[1] for _ in range(RUNS))
+    assert elapsed < BUDGET_MS, f"first request after {elapsed:.0f} ms; budget {BUDGET_MS:.0f} ms"
@@ -0,0 +1,91 @@
+"""SMTP pool tests against a local aiosmtpd server"""
+import asyncio
+import smtplib
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.handlers import Sink  # noqa: E402
+
+from email_outbox import EmailConfig, SMTPPool, build_message  # noqa: E402
+
+
+class Recorder(Sink):
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@invalid.test"):
+            return "550 no such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = Recorder()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_pool(controller, size=2):
+    config = EmailConfig(
+        smtp_server=controller.hostname,
+        smtp_port=controller.port,
+        email="bakery@example.test",
+        use_tls=False,
+        timeout=5,
+    )
+    return SMTPPool(config, size=size)
+
+
+def message(to):
+    return build_message("bakery@example.test", to, "Order Confirmation", "text body", "<p>html body</p>")
+
+
+def test_pool_reuses_connections(smtp_server):
+    controller, handler = smtp_server
+
+    async def run():
+        pool = make_pool(controller, size=2)
+        recipients = [f"customer{i}@example.test" for i in range(10)]
+        await asyncio.gather(*(pool.send(to, message(to)) for to in recipients))
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(run())
+    assert len(handler.messages) == 10
+    assert pool.connects <= 2
+    assert len(handler.sessions) <= 2
+
+
+def test_refused_recipient_keeps_connection(smtp_server):
+    controller, handler = smtp_server
+
+    async def run():
+        pool = make_pool(controller, size=1)
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            await pool.send("nobody@invalid.test", message("nobody@invalid.test"))
+        await pool.send("customer@example.test", message("customer@example.test"))
+        await pool.close()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.connects == 1
+    assert [m.rcpt_tos for m in handler.messages] == [["customer@example.test"]]
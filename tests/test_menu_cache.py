@@ -0,0 +1,116 @@
+"""Serialized menu responses are cached with ETags and dropped when the menu changes"""
+import asyncio
+
+from menu_cache import MenuCache, etag_matches, serialize_menu
+
+CROISSANT = {"id": "a", "name": "Croissant", "category": "bakery", "price": 3.5}
+LATTE = {"id": "b", "name": "Latte", "category": "cafe", "price": 4.25}
+
+
+class Menu:
+    """A loader over a mutable menu that counts its loads"""
+
+    def __init__(self, *items):
+        self.items = list(items)
+        self.loads = 0
+
+    async def __call__(self, category):
+        self.loads += 1
+        return [item for item in self.items if category is None or item["category"] == category]
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_cached_bodies_and_304():
+    async def run():
+        menu = Menu(CROISSANT, LATTE)
+        cache = MenuCache(menu)
+        full = await cache.response(None, None)
+        again = await cache.response(None, None)
+        bakery = await cache.response("bakery", None)
+        current = await cache.response(None, full.headers["ETag"])
+        stale = await cache.response(None, '"not-the-menu"')
+        return menu.loads, full, again, bakery, current, stale
+
+    loads, full, again, bakery, current, stale = asyncio.run(run())
+    assert loads == 2  # the full menu and bakery, once each
+    assert full.body == serialize_menu([CROISSANT, LATTE]) == again.body
+    assert full.headers["ETag"] == again.headers["ETag"] != bakery.headers["ETag"]
+    assert full.headers["Cache-Control"] == "no-cache"
+    assert (current.status_code, current.body, current.headers["ETag"]) == (304, b"", full.headers["ETag"])
+    assert (stale.status_code, stale.body) == (200, full.body)
+
+
+def test_invalidate_reloads_with_a_new_etag():
+    async def run():
+        menu = Menu(CROISSANT)
+        cache = MenuCache(menu)
+        before = await cache.get()
+        menu.items.append(LATTE)
+        unchanged = await cache.get()  # not invalidated yet
+        cache.invalidate()
+        after = await cache.get()
+        return before, unchanged, after
+
+    before, unchanged, after = asyncio.run(run())
+    assert unchanged is before
+    assert after.etag != before.etag and after.body == serialize_menu([CROISSANT, LATTE])
+
+
+def test_menu_change_during_a_load_is_not_cached():
+    async def run():
+        menu = Menu(CROISSANT)
+        loading = asyncio.Event()
+        proceed = asyncio.Event()
+
+        async def loader(category):
+            items = await menu(category)
+            if menu.loads == 1:
+                loading.set()
+                await proceed.wait()
+            return items
+
+        cache = MenuCache(loader)
+        first = asyncio.create_task(cache.get())
+        await loading.wait()
+        # The menu is edited while the old version is being read
+        menu.items.append(LATTE)
+        cache.invalidate()
+        proceed.set()
+        return await first, await cache.get()
+
+    stale, fresh = asyncio.run(run())
+    assert stale.body == serialize_menu([CROISSANT])
+    assert fresh.body == serialize_menu([CROISSANT, LATTE])
+
+
+def test_concurrent_misses_load_once_and_ttl_zero_never_caches():
+    async def run():
+        menu = Menu(CROISSANT)
+        cache = MenuCache(menu)
+        await asyncio.gather(*(cache.get() for _ in range(10)))
+        uncached_menu = Menu(CROISSANT)
+        uncached = MenuCache(uncached_menu, ttl=0)
+        await uncached.get()
+        await uncached.get()
+        return menu.loads, uncached_menu.loads
+
+    assert asyncio.run(run()) == (1, 2)
+
+
+def test_categories_are_bounded():
+    async def run():
+        menu = Menu(CROISSANT)
+        cache = MenuCache(menu, max_entries=2)
+        for category in ("bakery", "cafe", "nope", "nope"):
+            await cache.get(category)
+        return menu.loads
+
+    assert asyncio.run(run()) == 4  # "nope" did not fit, so it is loaded every time
@@ -0,0 +1,85 @@
+"""Menu search from the inverted index"""
+import asyncio
+
+from menu_search import InvertedIndex, MenuSearch, parse_terms, tokenize
+
+MENU = [
+    {"id": "croissant", "name": "Butter Croissant", "description": "Flaky and golden",
+     "ingredients": ["Flour", "Butter", "Eggs"]},
+    {"id": "pain", "name": "Pain au Chocolat", "description": "Croissant dough with dark chocolate",
+     "ingredients": ["Flour", "Butter", "Dark chocolate"]},
+    {"id": "brulee", "name": "Crème Brûlée", "description": "Vanilla custard", "ingredients": ["Cream", "Eggs"]},
+    {"id": "cookie", "name": "Chocolate Cookie", "description": "Chewy", "ingredients": ["Flour", "Tree nuts"],
+     "available": False},
+]
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+def index(items=MENU):
+    built = InvertedIndex()
+    built.update(items)
+    return built
+
+
+def test_tokenize():
+    assert tokenize("Crème Brûlée, 2x") == ["creme", "brulee", "2x"]
+    assert parse_terms("Tree nuts, egg,") == [["tree", "nuts"], ["egg"]]
+
+
+def test_prefix_matches_rank_names_first():
+    search = index().search
+    # The name match outranks the description match; prefixes match too
+    assert ids(search("croissant")) == ["croissant", "pain"]
+    assert ids(search("crois")) == ["croissant", "pain"]
+    assert ids(search("choc")) == ["pain"]
+    assert ids(search("creme brul")) == ["brulee"]
+    assert ids(search("flaky chocolate")) == []
+    assert ids(search("", limit=2)) == ["croissant", "pain"]
+
+
+def test_excluded_ingredients_and_unavailable_items():
+    search = index().search
+    assert ids(search(None, "egg")) == ["pain"]
+    assert ids(search("butter", "dark chocolate")) == ["croissant"]
+    # The cookie is indexed but not available
+    assert ids(search("cookie")) == []
+    assert "cookie" not in ids(search(None))
+
+
+def test_menu_changes_update_the_index():
+    built = index()
+    renamed = dict(MENU[2], name="Vanilla Flan", ingredients=["Milk"])
+    back = dict(MENU[3], available=True)
+    # pain dropped and brulee re-indexed; the cookie only changed availability
+    assert built.update([MENU[0], renamed, back]) == 2
+    assert ids(built.search("brulee")) == []
+    assert ids(built.search("flan")) == ["brulee"]
+    assert ids(built.search("pain")) == []
+    assert ids(built.search("cookie")) == ["cookie"]
+    assert sorted(ids(built.search(None, "egg"))) == ["brulee", "cookie"]
+    assert built.update([MENU[0], renamed, back]) == 0
+    assert built.update([]) == 3
+    assert built.search(None) == [] and built._words == []
+
+
+def test_menu_search_reloads_after_invalidate():
+    async def run():
+        menu = [MENU[0]]
+        loads = []
+
+        async def loader():
+            loads.append(len(menu))
+            return list(menu)
+
+        search = MenuSearch(loader)
+        first = await search.search("pain")
+        menu.append(MENU[1])
+        cached = await search.search("pain")
+        search.invalidate()
+        fresh = await search.search("pain")
+        return ids(first), ids(cached), ids(fresh), loads
+
+    assert asyncio.run(run()) == ([], [], ["pain"], [1, 2])
@@ -0,0 +1,66 @@
+"""Replaying a batch of orders never stores an order twice"""
+import asyncio
+import uuid
+
+import services
+
+
+def order_payload(menu, key, pickup_time="2030-01-07T09:00"):
+    return {
+        "customer_name": "Ada",
+        "customer_email": "ada@example.test",
+        "customer_phone": "555-0100",
+        "items": [{**menu[0], "quantity": 1}],
+        "total_amount": 0,
+        "pickup_time": pickup_time,
+        "idempotency_key": key,
+    }
+
+
+async def reserved():
+    return (await services.db.pickup_slots.find_one({"_id": "2030-01-07T09:00"}))["reserved"]
+
+
+def test_replayed_batch_reports_duplicates(in_memory_api):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            batch = {"orders": [order_payload(menu, "a"), order_payload(menu, "b"), order_payload(menu, "a")]}
+            first = (await client.post("/api/orders/batch", json=batch)).json()
+            replay = (await client.post("/api/orders/batch", json=batch)).json()
+            return first, replay, await services.db.orders.count_documents({}), await reserved()
+
+    first, replay, stored, taken = asyncio.run(run())
+    # A key repeated within the batch is stored once and reported as a duplicate of it
+    assert [result["status"] for result in first] == ["created", "created", "duplicate"]
+    assert first[2]["order"]["id"] == first[0]["order"]["id"]
+    # The replay finds every order in the lookup before inserting
+    assert [result["status"] for result in replay] == ["duplicate"] * 3
+    assert [result["order"]["id"] for result in replay] == [result["order"]["id"] for result in first]
+    assert (stored, taken) == (2, 2)
+
+
+def test_concurrent_insert_of_the_same_key(in_memory_api, monkeypatch):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            orders = type(services.db.orders)
+            insert_many = orders.insert_many
+
+            async def racing_insert_many(collection, documents, **kwargs):
+                # Another request stores "a" between the lookup and our insert
+                await collection.insert_one({**documents[0], "id": str(uuid.uuid4()), "_id": "racer"})
+                return await insert_many(collection, documents, **kwargs)
+
+            monkeypatch.setattr(orders, "insert_many", racing_insert_many)
+            batch = {"orders": [order_payload(menu, "a"), order_payload(menu, "b")]}
+            results = (await client.post("/api/orders/batch", json=batch)).json()
+            racer = await services.db.orders.find_one({"_id": "racer"})
+            return results, racer, await services.db.orders.count_documents({}), await reserved()
+
+    results, racer, stored, taken = asyncio.run(run())
+    # Reported with the order the other request stored; its place goes back
+    assert [result["status"] for result in results] == ["duplicate", "created"]
+    assert results[0]["order"]["id"] == racer["id"]
+    assert stored == 2
+    assert taken == 1  # the racer never reserved, so only "b" holds a place
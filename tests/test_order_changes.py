@@ -0,0 +1,76 @@
+"""Consecutive change exports neither skip nor repeat an order"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import admin_api
+import services
+from order_export import as_utc, changes_query
+
+T0 = datetime(2030, 1, 7, 12, 0, 0)
+
+
+def test_changes_query():
+    until = datetime(2030, 1, 7, 11, 59, 55)
+    assert changes_query(None, until) == {"updated_at": {"$not": {"$gte": until}}}
+    assert changes_query(T0 - timedelta(hours=1), until) == {"updated_at": {"$gte": T0 - timedelta(hours=1), "$lt": until}}
+    assert as_utc(datetime(2030, 1, 7, 14, 0, tzinfo=timezone(timedelta(hours=2)))) == T0
+    assert as_utc(T0) == T0 and as_utc(None) is None
+
+
+class Clock(datetime):
+    now_utc = T0
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_utc
+
+
+def test_back_to_back_syncs(in_memory_api, monkeypatch):
+    monkeypatch.setattr(admin_api, "datetime", Clock)
+    monkeypatch.setattr(Clock, "now_utc", T0)
+
+    async def sync(client, since=None):
+        response = await client.get("/api/admin/orders/changes", params={"since": since} if since else None)
+        names = [json.loads(line)["customer_name"] for line in response.text.splitlines()]
+        return names, response.headers["X-Next-Watermark"]
+
+    async def run():
+        async with in_memory_api(order_changes_settle=5) as client:
+            menu = (await client.get("/api/menu")).json()
+            for name in ("legacy", "before", "boundary", "settling"):
+                await client.post("/api/orders", json={
+                    "customer_name": name,
+                    "customer_email": "ada@example.test",
+                    "customer_phone": "555-0100",
+                    "items": [{**menu[0], "quantity": 1}],
+                    "total_amount": 0,
+                    "pickup_time": "2030-01-07T09:00",
+                })
+            orders = services.db.orders
+            # Stored before updated_at existed
+            await orders.update_one({"customer_name": "legacy"}, {"$unset": {"updated_at": ""}})
+            for name, stamp in (("before", "11:59:54"), ("boundary", "11:59:55"), ("settling", "11:59:57")):
+                at = datetime.combine(T0.date(), datetime.strptime(stamp, "%H:%M:%S").time())
+                await orders.update_one({"customer_name": name}, {"$set": {"updated_at": at}})
+
+            first, watermark = await sync(client)
+            monkeypatch.setattr(Clock, "now_utc", T0 + timedelta(seconds=10))
+            second, next_watermark = await sync(client, watermark)
+            # The same watermark sent with an offset reads the same window
+            offset = (datetime.fromisoformat(watermark) + timedelta(hours=2)).isoformat() + "+02:00"
+            again, _ = await sync(client, offset)
+            third, last_watermark = await sync(client, next_watermark)
+            # A watermark from the future is handed back, never an earlier one
+            future = (T0 + timedelta(minutes=5)).isoformat()
+            ahead, ahead_watermark = await sync(client, future)
+            return first, watermark, second, next_watermark, again, third, ahead, ahead_watermark, future
+
+    first, watermark, second, next_watermark, again, third, ahead, ahead_watermark, future = asyncio.run(run())
+    # The window closes ORDER_CHANGES_SETTLE_SECONDS behind the clock, excluding its end
+    assert watermark == "2030-01-07T11:59:55"
+    assert first == ["legacy", "before"]
+    assert (second, next_watermark) == (["boundary", "settling"], "2030-01-07T12:00:05")
+    assert again == second
+    assert third == []
+    assert (ahead, ahead_watermark) == ([], future)
@@ -0,0 +1,37 @@
+"""A confirmation email that cannot be queued does not fail the stored order"""
+import asyncio
+
+from pymongo.errors import AutoReconnect
+
+import services
+
+
+def order_payload(menu, **extra):
+    return {
+        "customer_name": "Ada",
+        "customer_email": "ada@example.test",
+        "customer_phone": "555-0100",
+        "items": [{**menu[0], "quantity": 1}],
+        "total_amount": 0,
+        "pickup_time": "2030-01-07T09:00",
+        **extra,
+    }
+
+
+def test_orders_are_returned_when_the_outbox_is_down(in_memory_api, monkeypatch):
+    async def outbox_down(*args, **kwargs):
+        raise AutoReconnect("connection closed")
+
+    async def run():
+        async with in_memory_api(smtp_email="bakery@example.test") as client:
+            monkeypatch.setattr(services.email_outbox, "enqueue", outbox_down)
+            monkeypatch.setattr(services.email_outbox, "enqueue_many", outbox_down)
+            menu = (await client.get("/api/menu")).json()
+            single = await client.post("/api/orders", json=order_payload(menu))
+            batch = await client.post("/api/orders/batch", json={"orders": [order_payload(menu, idempotency_key="a")]})
+            return single, batch, await services.db.orders.count_documents({})
+
+    single, batch, stored = asyncio.run(run())
+    assert single.status_code == 200 and single.json()["customer_name"] == "Ada"
+    assert batch.status_code == 200 and batch.json()[0]["status"] == "created"
+    assert stored == 2
@@ -0,0 +1,111 @@
+"""The CSV export streams orders in batches, optionally gzipped and filtered"""
+import asyncio
+import csv
+import gzip
+import io
+from datetime import datetime
+
+import pytest
+
+from order_export import accepts_gzip, build_query, select_columns, stream_orders_csv
+
+
+def order(n, **extra):
+    return {
+        "id": f"order-{n:04d}-xxxx",
+        "order_date": datetime(2030, 1, 7, 9, n),
+        "customer_name": f"Customer {n}",
+        "customer_email": "c@example.test",
+        "customer_phone": "555-0100",
+        "items": [{"name": "Croissant", "quantity": 2, "price": 3.5}],
+        "total_amount": 7.0,
+        "pickup_time": "2030-01-08T09:00",
+        "special_requests": "",
+        "status": "pending",
+        **extra,
+    }
+
+
+def export(orders, query=None, columns=None, **kwargs):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def run():
+        collection = mongomock_motor.AsyncMongoMockClient()["export_test"].orders
+        if orders:
+            await collection.insert_many(orders)
+        return [
+            chunk async for chunk in stream_orders_csv(
+                collection, query or {}, columns or select_columns(None), **kwargs
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def test_rows_are_written_one_chunk_per_batch():
+    chunks = export([order(n) for n in range(5)], batch_size=2)
+    assert len(chunks) == 3  # rows 1-2 (with the header), 3-4, 5
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0][:3] == ["Order ID", "Date", "Customer Name"]
+    assert [row[2] for row in rows[1:]] == [f"Customer {n}" for n in (4, 3, 2, 1, 0)]  # newest first
+    assert rows[1][0] == "order-00" and rows[1][1] == "2030-01-07 09:04"
+    assert rows[1][5:8] == ["Croissant x2", "$7.00", "2030-01-08T09:00"]
+
+
+def test_empty_export_is_just_the_header():
+    assert export([], columns=["id", "total_amount"]) == [b"Order ID,Total Amount\r\n"]
+
+
+def test_gzip_output():
+    chunks = export([order(n, special_requests='Say "hi", please') for n in range(5)], batch_size=2, compress=True)
+    plain = export([order(n, special_requests='Say "hi", please') for n in range(5)], batch_size=2)
+    assert gzip.decompress(b"".join(chunks)) == b"".join(plain)
+
+
+def test_fields_and_date_filters():
+    orders = [order(n) for n in range(5)]
+    query = build_query(datetime(2030, 1, 7, 9, 1), datetime(2030, 1, 7, 9, 3))
+    chunks = export(orders, query, select_columns(" customer_name , status"))
+    assert b"".join(chunks).decode().splitlines() == [
+        "Customer Name,Status", "Customer 2,pending", "Customer 1,pending",
+    ]
+    assert build_query() == {}
+    assert build_query(date_to=datetime(2030, 1, 7)) == {"order_date": {"$lt": datetime(2030, 1, 7)}}
+    with pytest.raises(ValueError, match="Unknown export fields: password"):
+        select_columns("id,password")
+    with pytest.raises(ValueError):
+        select_columns(" , ")
+
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, GZIP;q=0.5")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("deflate")
+    assert not accepts_gzip(None)
+
+
+def test_export_endpoint(in_memory_api):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            for hour in (9, 10):
+                await client.post("/api/orders", json={
+                    "customer_name": f"Pickup {hour}",
+                    "customer_email": "ada@example.test",
+                    "customer_phone": "555-0100",
+                    "items": [{**menu[0], "quantity": 1}],
+                    "total_amount": 0,
+                    "pickup_time": f"2030-01-07T{hour:02d}:00",
+                })
+            gzipped = await client.get(
+                "/api/admin/orders/export", params={"fields": "customer_name"}, headers={"Accept-Encoding": "gzip"}
+            )
+            unknown = await client.get("/api/admin/orders/export", params={"fields": "nope"})
+            return gzipped, unknown
+
+    gzipped, unknown = asyncio.run(run())
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.headers["Content-Disposition"] == "attachment; filename=bakery_orders.csv"
+    assert gzipped.text.splitlines() == ["Customer Name", "Pickup 10", "Pickup 9"]  # httpx decodes gzip
+    assert unknown.status_code == 400
@@ -0,0 +1,196 @@
+"""Status changes follow the workflow, and cancelling an order undoes what placing it counted"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import services
+from order_feed import OrderFeed
+from order_status import SOURCES, TRANSITIONS, conflict_detail, transition_filter, transition_update
+
+
+def test_transition_table():
+    assert SOURCES == {
+        "pending": [],
+        "preparing": ["pending"],
+        "ready": ["preparing"],
+        "picked_up": ["ready"],
+        "cancelled": ["pending", "preparing", "ready"],
+    }
+    assert transition_filter("a", "ready") == {"id": "a", "status": {"$in": ["preparing"]}}
+    assert conflict_detail("picked_up", "cancelled") == "Cannot change status from picked_up to cancelled (allowed: none)"
+    assert conflict_detail("pending", "ready") == (
+        "Cannot change status from pending to ready (allowed: preparing, cancelled)"
+    )
+    assert all(target in TRANSITIONS for targets in TRANSITIONS.values() for target in targets)
+
+    now = datetime(2030, 1, 7, 9, 0)
+    assert transition_update("ready", now) == {"$set": {"status": "ready", "updated_at": now}}
+
+
+def test_cancellation_event_carries_the_stats_delta():
+    async def run():
+        feed = OrderFeed(lambda order: b"{}")
+        stream = feed.stream()
+        await stream.__anext__()  # retry hint
+        order = {"id": "a", "order_date": datetime(2030, 1, 7, 8, 0), "total_amount": 7.5}
+        feed.publish_status(order, "ready", now=datetime(2030, 1, 7, 9, 0))
+        feed.publish_status(order, "cancelled", now=datetime(2030, 1, 7, 9, 0))
+        feed.publish_status(order, "cancelled", now=datetime(2030, 1, 8, 9, 0))
+        events = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return events
+
+    ready, cancelled_today, cancelled_later = asyncio.run(run())
+    assert ready == b'event: status\ndata: {"id":"a","status":"ready"}\n\n'
+    assert b'"stats":{"total_orders":-1,"today_orders":-1,"today_revenue":-7.5}' in cancelled_today
+    assert b'"stats":{"total_orders":-1,"today_orders":0,"today_revenue":0}' in cancelled_later
+
+
+@pytest.fixture
+def projected_updates(monkeypatch):
+    """mongomock re-applies the filter after the update when find_one_and_update has a projection
+    and returns the new document, so it finds nothing; project the whole document here instead"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockCollection
+    find_one_and_update = collection.find_one_and_update
+
+    async def without_projection(self, *args, projection=None, **kwargs):
+        doc = await find_one_and_update(self, *args, **kwargs)
+        if doc is not None and projection:
+            doc = {key: value for key, value in doc.items() if projection.get(key, 1)}
+        return doc
+
+    monkeypatch.setattr(collection, "find_one_and_update", without_projection)
+
+
+def order_payload(menu, pickup_time):
+    return {
+        "customer_name": "Ada",
+        "customer_email": "ada@example.test",
+        "customer_phone": "555-0100",
+        "items": [{**menu[0], "quantity": 2}],
+        "total_amount": 0,
+        "pickup_time": pickup_time,
+    }
+
+
+def test_single_status_change_errors(in_memory_api):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            order = (await client.post("/api/orders", json=order_payload(menu, "2030-01-07T09:00"))).json()
+            skipped = await client.patch(f"/api/orders/{order['id']}/status", json={"status": "ready"})
+            missing = await client.patch("/api/orders/nope/status", json={"status": "ready"})
+            unknown = await client.patch(f"/api/orders/{order['id']}/status", json={"status": "eaten"})
+            return skipped, missing, unknown
+
+    skipped, missing, unknown = asyncio.run(run())
+    assert (skipped.status_code, skipped.json()["detail"]) == (
+        409, "Cannot change status from pending to ready (allowed: preparing, cancelled)"
+    )
+    assert missing.status_code == 404
+    assert unknown.status_code == 422
+
+
+def test_bulk_status_changes(in_memory_api, projected_updates, monkeypatch):
+    evicted = []
+
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            ids = [
+                (await client.post("/api/orders", json=order_payload(menu, pickup))).json()["id"]
+                for pickup in ("2030-01-07T09:00", "2030-01-07T09:05", "2030-01-07T10:00")
+            ]
+            before = await services.sales_rollups.totals()
+
+            async def evict(order_dates):
+                evicted.extend(order_dates)
+
+            monkeypatch.setattr(services.revenue_series, "evict", evict)
+            first = await client.patch("/api/orders/status", json={"changes": [
+                {"id": ids[0], "status": "preparing"},
+                {"id": ids[1], "status": "ready"},
+                {"id": ids[2], "status": "cancelled"},
+                {"id": "nope", "status": "ready"},
+            ]})
+            # Already preparing, so this request changes nothing
+            again = await client.patch("/api/orders/status", json={"changes": [{"id": ids[0], "status": "preparing"}]})
+            cancel = await client.patch("/api/orders/status", json={"changes": [{"id": ids[1], "status": "cancelled"}]})
+            after = await services.sales_rollups.totals()
+            slots = {slot["start"]: slot["reserved"] for slot in (await client.get("/api/slots?date=2030-01-07")).json()}
+            prep = (await client.get("/api/prep?date=2030-01-07")).json()["items"]
+            return ids, first.json(), again.json(), cancel.json(), before, after, slots, prep
+
+    ids, first, again, cancel, before, after, slots, prep = asyncio.run(run())
+    assert [(result["id"], result["result"], result.get("status")) for result in first] == [
+        (ids[0], "updated", "preparing"),
+        (ids[1], "conflict", "pending"),
+        (ids[2], "updated", "cancelled"),
+        ("nope", "not_found", None),
+    ]
+    assert [(result["result"], result["status"]) for result in again] == [("conflict", "preparing")]
+    assert cancel[0]["result"] == "updated"
+
+    # Two of three orders cancelled: their places, counts and cached revenue go
+    assert after["orders"] == before["orders"] - 2
+    assert after["revenue"] == pytest.approx(before["revenue"] / 3)
+    assert (slots["2030-01-07T09:00:00"], slots["2030-01-07T10:00:00"]) == (1, 0)
+    assert [item["quantity"] for item in prep] == [2]
+    assert len(evicted) == 2
+
+
+def test_single_status_change_and_cancellation(in_memory_api, projected_updates):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            order = (await client.post("/api/orders", json=order_payload(menu, "2030-01-07T09:00"))).json()
+            before = await services.sales_rollups.totals()
+            feed = services.order_feed.stream()
+            await feed.__anext__()  # retry hint
+            preparing = await client.patch(f"/api/orders/{order['id']}/status", json={"status": "preparing"})
+            cancelled = await client.patch(f"/api/orders/{order['id']}/status", json={"status": "cancelled"})
+            events = [await feed.__anext__(), await feed.__anext__()]
+            await feed.aclose()
+            slot = await services.db.pickup_slots.find_one({"_id": "2030-01-07T09:00"})
+            return order, preparing, cancelled, events, before, await services.sales_rollups.totals(), slot
+
+    order, preparing, cancelled, events, before, after, slot = asyncio.run(run())
+    assert (preparing.status_code, preparing.json()["status"]) == (200, "preparing")
+    assert (cancelled.status_code, cancelled.json()["status"]) == (200, "cancelled")
+    assert "_id" not in cancelled.json()
+    assert events[0] == b'event: status\ndata: {"id":"%s","status":"preparing"}\n\n' % order["id"].encode()
+    assert b'"status":"cancelled","stats":{"total_orders":-1' in events[1]
+    assert after["orders"] == before["orders"] - 1
+    assert slot["reserved"] == 0
+
+
+def test_concurrent_bulk_changes_report_their_own_updates(in_memory_api, projected_updates, monkeypatch):
+    collection = pytest.importorskip("mongomock_motor").AsyncMongoMockCollection
+
+    def yielding(write):
+        async def wrapper(self, *args, **kwargs):
+            result = await write(self, *args, **kwargs)
+            await asyncio.sleep(0)  # the other request's write lands before this one reads anything
+            return result
+        return wrapper
+
+    for method in ("find_one_and_update", "bulk_write"):
+        monkeypatch.setattr(collection, method, yielding(getattr(collection, method)))
+
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            order = (await client.post("/api/orders", json=order_payload(menu, "2030-01-07T09:00"))).json()
+            first, second = await asyncio.gather(
+                client.patch("/api/orders/status", json={"changes": [{"id": order["id"], "status": "preparing"}]}),
+                client.patch("/api/orders/status", json={"changes": [{"id": order["id"], "status": "ready"}]}),
+            )
+            current = await services.db.orders.find_one({"id": order["id"]})
+            return first.json(), second.json(), current["status"]
+
+    first, second, status = asyncio.run(run())
+    assert (first[0]["result"], first[0]["status"]) == ("updated", "preparing")
+    assert (second[0]["result"], second[0]["status"]) == ("updated", "ready")
+    assert status == "ready"
@@ -0,0 +1,92 @@
+"""Order lists are paged by (order_date, id) with opaque cursors"""
+import asyncio
+import base64
+from datetime import datetime
+
+import pytest
+
+from pagination import InvalidCursor, after_cursor, decode_cursor, encode_cursor, fetch_page
+
+
+def token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    doc = {"order_date": datetime(2030, 1, 7, 9, 0, 0, 123456), "id": "b"}
+    cursor = encode_cursor(doc)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (doc["order_date"], "b")
+    assert after_cursor(cursor) == {
+        "$or": [
+            {"order_date": {"$lt": doc["order_date"]}},
+            {"order_date": doc["order_date"], "id": {"$lt": "b"}},
+        ]
+    }
+    assert after_cursor(None) == after_cursor("") == {}
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    token(b"not json"),
+    token(b"[]"),
+    token(b'{"d": "2030-01-07T09:00:00"}'),
+    token(b'{"d": "yesterday", "i": "a"}'),
+    token(b'{"d": 5, "i": "a"}'),
+])
+def test_garbage_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        after_cursor(cursor)
+
+
+def test_pages_split_ties_on_order_date():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def run():
+        orders = mongomock_motor.AsyncMongoMockClient()["pagination_test"].orders
+        same_time = datetime(2030, 1, 7, 9, 0)
+        await orders.insert_many(
+            [{"id": f"order-{n}", "order_date": same_time, "total_amount": n} for n in range(5)]
+            + [{"id": "older", "order_date": datetime(2030, 1, 6), "total_amount": 9}]
+        )
+        pages = []
+        cursor = None
+        while True:
+            docs, cursor = await fetch_page(orders, 2, cursor, {"_id": 0, "total_amount": 1})
+            pages.append(docs)
+            if cursor is None:
+                return pages
+
+    pages = asyncio.run(run())
+    assert [[doc["id"] for doc in page] for page in pages] == [
+        ["order-4", "order-3"], ["order-2", "order-1"], ["order-0", "older"],
+    ]
+    # The sort key is kept for the next token even when not asked for
+    assert set(pages[0][0]) == {"id", "order_date", "total_amount"}
+
+
+def test_order_list_fields_and_cursor_errors(in_memory_api):
+    async def run():
+        async with in_memory_api(order_page_size=2) as client:
+            menu = (await client.get("/api/menu")).json()
+            for hour in (9, 10, 11):
+                (await client.post("/api/orders", json={
+                    "customer_name": "Ada",
+                    "customer_email": "ada@example.test",
+                    "customer_phone": "555-0100",
+                    "items": [{**menu[0], "quantity": 1}],
+                    "total_amount": 0,
+                    "pickup_time": f"2030-01-07T{hour:02d}:00",
+                })).raise_for_status()
+            first = await client.get("/api/admin/orders", params={"fields": "customer_name, total_amount"})
+            rest = await client.get("/api/admin/orders", params={"cursor": first.headers["X-Next-Cursor"]})
+            unknown = await client.get("/api/orders", params={"fields": "customer_name,password"})
+            garbage = await client.get("/api/orders", params={"cursor": "garbage"})
+            return first, rest, unknown, garbage
+
+    first, rest, unknown, garbage = asyncio.run(run())
+    assert [set(order) for order in first.json()] == [{"id", "order_date", "customer_name", "total_amount"}] * 2
+    assert len(rest.json()) == 1 and "X-Next-Cursor" not in rest.headers
+    assert "items" in rest.json()[0]
+    assert unknown.status_code == 400 and "password" in unknown.json()["detail"]
+    assert garbage.status_code == 400
@@ -0,0 +1,139 @@
+"""Pickup slot reservations never exceed capacity and are given back when an order is not stored"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import services  # noqa: E402
+from slots import PickupSlots, SlotError  # noqa: E402
+
+SLOT = datetime(2030, 1, 7, 9, 0)
+
+
+def slots(capacity):
+    return PickupSlots(mongomock_motor.AsyncMongoMockClient()["slots_test"].pickup_slots, capacity=capacity)
+
+
+def test_bookable_slot():
+    pickup = slots(10)
+    now = datetime(2030, 1, 7, 9, 10)
+    assert pickup.bookable_slot("2030-01-07T09:14:59+02:00", now) == SLOT
+    assert pickup.bookable_slot("2030-01-07T18:59", now) == datetime(2030, 1, 7, 18, 45)
+    for rejected in ("2030-01-07T06:59", "2030-01-07T19:00", "2030-01-07T08:59", "tomorrow", None):
+        with pytest.raises(SlotError):
+            pickup.bookable_slot(rejected, now)
+    # Bucketing alone still accepts any time, e.g. for releasing old orders
+    assert pickup.slot_for("2030-01-07T03:05") == datetime(2030, 1, 7, 3, 0)
+
+
+def test_reserve_up_to_capacity():
+    async def run():
+        pickup = slots(3)
+        # First reservation upserts the counter; the next ones match it
+        granted = [await pickup.reserve(SLOT), await pickup.reserve(SLOT)]
+        # A full slot fails the conditional upsert with a duplicate _id
+        granted += [await pickup.reserve(SLOT), await pickup.reserve(SLOT)]
+        return granted, await pickup.collection.find_one({"_id": "2030-01-07T09:00"})
+
+    granted, counter = asyncio.run(run())
+    assert granted == [1, 1, 1, 0]
+    assert counter["reserved"] == 3
+
+
+def test_reserve_grants_what_is_left():
+    async def run():
+        pickup = slots(3)
+        first = await pickup.reserve(SLOT, 2)
+        second = await pickup.reserve(SLOT, 3)
+        too_many = await pickup.reserve(datetime(2030, 1, 7, 10, 0), 5)
+        return first, second, too_many, await pickup.day(SLOT.date())
+
+    first, second, too_many, day = asyncio.run(run())
+    assert (first, second, too_many) == (2, 1, 3)
+    assert next(slot for slot in day if slot["start"] == SLOT)["remaining"] == 0
+
+
+def test_release_never_goes_negative():
+    async def run():
+        pickup = slots(3)
+        await pickup.release(SLOT)  # an order placed before slots existed
+        await pickup.reserve(SLOT, 2)
+        await pickup.release(SLOT)
+        await pickup.release(SLOT, 5)
+        return (await pickup.collection.find_one({"_id": "2030-01-07T09:00"}))["reserved"]
+
+    assert asyncio.run(run()) == 1
+
+
+def order_payload(menu, pickup_time="2030-01-07T09:00", **extra):
+    return {
+        "customer_name": "Ada",
+        "customer_email": "ada@example.test",
+        "customer_phone": "555-0100",
+        "items": [{**menu[0], "quantity": 1}],
+        "total_amount": 0,
+        "pickup_time": pickup_time,
+        **extra,
+    }
+
+
+async def reserved(slot="2030-01-07T09:00"):
+    counter = await services.db.pickup_slots.find_one({"_id": slot})
+    return counter["reserved"] if counter else 0
+
+
+def test_create_order_checks_the_slot(in_memory_api):
+    async def run():
+        async with in_memory_api(pickup_slot_capacity=1) as client:
+            menu = (await client.get("/api/menu")).json()
+            placed = await client.post("/api/orders", json=order_payload(menu))
+            full = await client.post("/api/orders", json=order_payload(menu, "2030-01-07T09:10"))
+            closed = await client.post("/api/orders", json=order_payload(menu, "2030-01-07T03:00"))
+            past = await client.post("/api/orders", json=order_payload(menu, "2001-01-08T09:00"))
+            return placed, full, closed, past, await reserved()
+
+    placed, full, closed, past, taken = asyncio.run(run())
+    assert placed.status_code == 200
+    assert (full.status_code, full.json()["detail"]) == (409, "Pickup slot 2030-01-07T09:00 is full")
+    assert closed.status_code == 400 and "opening hours" in closed.json()["detail"]
+    assert past.status_code == 400 and "passed" in past.json()["detail"]
+    assert taken == 1
+
+
+def lose_connection(collection, method, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AutoReconnect("connection closed")
+
+    monkeypatch.setattr(type(collection), method, fail)
+
+
+def test_failed_insert_gives_the_place_back(in_memory_api, monkeypatch):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            lose_connection(services.db.orders, "insert_one", monkeypatch)
+            with pytest.raises(AutoReconnect):
+                await client.post("/api/orders", json=order_payload(menu))
+            return await reserved()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_failed_batch_insert_gives_every_place_back(in_memory_api, monkeypatch):
+    async def run():
+        async with in_memory_api() as client:
+            menu = (await client.get("/api/menu")).json()
+            lose_connection(services.db.orders, "insert_many", monkeypatch)
+            batch = [
+                order_payload(menu, idempotency_key="a"),
+                order_payload(menu, idempotency_key="b"),
+                order_payload(menu, "2030-01-07T10:00", idempotency_key="c"),
+            ]
+            with pytest.raises(AutoReconnect):
+                await client.post("/api/orders/batch", json={"orders": batch})
+            return await reserved(), await reserved("2030-01-07T10:00")
+
+    assert asyncio.run(run()) == (0, 0)
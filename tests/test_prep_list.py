@@ -0,0 +1,97 @@
+"""Prep counts per pickup slot follow orders and can be rebuilt from them"""
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from prep_list import PrepList, parse_window  # noqa: E402
+from slots import PickupSlots  # noqa: E402
+
+DAY = date(2030, 1, 7)
+
+
+def order(pickup_time, *items, status="pending"):
+    return {
+        "pickup_time": pickup_time,
+        "items": [{"id": item_id, "name": item_id.title(), "quantity": quantity} for item_id, quantity in items],
+        "status": status,
+    }
+
+
+def prep_list(db):
+    return PrepList(db, PickupSlots(db.pickup_slots).slot_for)
+
+
+async def counters(prep, query):
+    return {counter["_id"]: counter["quantity"] async for counter in prep.collection.find(query, {"_id": 1, "quantity": 1})}
+
+
+def quantities(items):
+    return {item["item_id"]: item["quantity"] for item in items}
+
+
+def test_parse_window():
+    assert parse_window(DAY, None) == (datetime(2030, 1, 7), datetime(2030, 1, 8))
+    assert parse_window(DAY, "07:30-08:00") == (datetime(2030, 1, 7, 7, 30), datetime(2030, 1, 7, 8, 0))
+    for window in ("08:00-07:30", "08:00", "breakfast"):
+        with pytest.raises(ValueError):
+            parse_window(DAY, window)
+
+
+def test_window_covers_slots_starting_inside_it():
+    async def run():
+        prep = prep_list(mongomock_motor.AsyncMongoMockClient()["prep_test"])
+        await prep.record([
+            order("2030-01-07T07:15", ("croissant", 1)),  # slot ends where the window starts
+            order("2030-01-07T07:30", ("croissant", 2)),  # on the start
+            order("2030-01-07T07:59", ("croissant", 3), ("latte", 1)),  # the 07:45 slot
+            order("2030-01-07T08:00", ("croissant", 4)),  # on the end
+        ])
+        return [quantities(await prep.window(*parse_window(DAY, window))) for window in ("07:30-08:00", "07:40-08:00", None)]
+
+    window, partial, day = asyncio.run(run())
+    assert window == {"croissant": 5, "latte": 1}
+    # 07:30-07:45 starts before 07:40, so it is not in the window
+    assert partial == {"croissant": 3, "latte": 1}
+    assert day == {"croissant": 10, "latte": 1}
+
+
+def test_cancellation_and_rebuild():
+    async def run():
+        db = mongomock_motor.AsyncMongoMockClient()["prep_test"]
+        prep = prep_list(db)
+        orders = [
+            order("2030-01-07T07:30", ("croissant", 2), ("latte", 1)),
+            order("2030-01-07T07:35", ("croissant", 1)),
+            order("2030-01-07T09:00", ("latte", 2)),
+            order("10:30", ("latte", 5)),  # placed before pickup slots
+        ]
+        await db.orders.insert_many([dict(o) for o in orders])
+        await prep.record(orders)
+        # Cancel the 09:00 order, as after_status_change does
+        await db.orders.update_one({"pickup_time": "2030-01-07T09:00"}, {"$set": {"status": "cancelled"}})
+        await prep.record([orders[2]], sign=-1)
+        incremental = quantities(await prep.window(*parse_window(DAY, None)))
+        maintained = await counters(prep, {"quantity": {"$gt": 0}})
+
+        assert await prep.rebuild(db.orders, chunk_size=2) == 3
+        rebuilt = quantities(await prep.window(*parse_window(DAY, None)))
+        rebuilt_counters = await counters(prep, {})
+        return incremental, rebuilt, maintained, rebuilt_counters
+
+    incremental, rebuilt, maintained, rebuilt_counters = asyncio.run(run())
+    assert incremental == rebuilt == {"croissant": 3, "latte": 1}
+    assert maintained == rebuilt_counters == {"2030-01-07T07:30|croissant": 3, "2030-01-07T07:30|latte": 1}
+
+
+def test_rebuild_without_orders():
+    async def run():
+        db = mongomock_motor.AsyncMongoMockClient()["prep_test"]
+        prep = prep_list(db)
+        await prep.record([order("2030-01-07T07:30", ("croissant", 2))])
+        assert await prep.rebuild(db.orders) == 0
+        return await prep.window(*parse_window(DAY, None))
+
+    assert asyncio.run(run()) == []
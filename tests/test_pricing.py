@@ -0,0 +1,96 @@
+"""Orders are priced from the menu; client prices and totals are ignored"""
+import asyncio
+
+import pytest
+
+import services
+from price_index import PricedItem, PricingError, price_items, price_orders
+
+
+def order_payload(items, total_amount=0.01, **extra):
+    return {
+        "customer_name": "Ada",
+        "customer_email": "ada@example.test",
+        "customer_phone": "555-0100",
+        "items": items,
+        "total_amount": total_amount,
+        "pickup_time": "2030-01-07T09:00",
+        **extra,
+    }
+
+
+def test_price_items():
+    index = {
+        "a": PricedItem(id="a", name="Croissant", price=3.5, category="bakery", available=True),
+        "b": PricedItem(id="b", name="Latte", price=4.25, category="cafe", available=False),
+    }
+    items, total = price_items([{"id": "a", "name": "Free", "price": 0, "quantity": 3, "category": "x"}], index)
+    assert items == [{"id": "a", "name": "Croissant", "price": 3.5, "quantity": 3, "category": "bakery"}]
+    assert total == 10.5
+
+    with pytest.raises(PricingError) as error:
+        price_items([
+            {"id": "nope", "quantity": 1}, {"id": "b", "quantity": 1}, {"id": "a", "quantity": 0},
+        ], index)
+    assert error.value.problems == [
+        "Unknown menu item 'nope'", "Latte is not available", "Invalid quantity 0 for Croissant",
+    ]
+    with pytest.raises(PricingError, match="Order has no items"):
+        price_items([], index)
+
+    [(priced, total, ok), (_, _, failed)] = price_orders([[{"id": "a", "quantity": 1}], [{"id": "b", "quantity": 1}]], index)
+    assert (total, ok, failed.problems) == (3.5, None, ["Latte is not available"])
+
+
+def test_tampered_prices_are_replaced(in_memory_api):
+    async def run():
+        async with in_memory_api() as client:
+            menu = [item for item in (await client.get("/api/menu")).json() if item["available"]][:2]
+            tampered = [
+                {**menu[0], "price": 0.01, "name": "Cheap", "quantity": 2},
+                {**menu[1], "price": 0, "quantity": 1},
+            ]
+            placed = (await client.post("/api/orders", json=order_payload(tampered))).json()
+            batch = (await client.post("/api/orders/batch", json={
+                "orders": [order_payload(tampered, idempotency_key="a")],
+            })).json()
+            stored = [
+                doc async for doc in services.db.orders.find({}, {"_id": 0, "id": 1, "items": 1, "total_amount": 1})
+            ]
+            return menu, placed, batch[0]["order"], stored
+
+    menu, placed, batched, stored = asyncio.run(run())
+    expected_total = round(menu[0]["price"] * 2 + menu[1]["price"], 2)
+    expected_items = [(menu[0]["name"], menu[0]["price"], 2), (menu[1]["name"], menu[1]["price"], 1)]
+    for order in (placed, batched, *stored):
+        assert order["total_amount"] == expected_total
+        assert [(item["name"], item["price"], item["quantity"]) for item in order["items"]] == expected_items
+    assert len(stored) == 2
+
+
+def test_unsellable_items_are_refused(in_memory_api):
+    async def run():
+        async with in_memory_api() as client:
+            menu = [item for item in (await client.get("/api/menu")).json() if item["available"]]
+            await services.db.menu_items.update_one({"id": menu[1]["id"]}, {"$set": {"available": False}})
+            await services.invalidate_menu()
+            lines = [
+                {**menu[0], "id": "not-on-the-menu", "quantity": 1},
+                {**menu[1], "quantity": 1},
+                {**menu[2], "quantity": 0},
+            ]
+            refused = await client.post("/api/orders", json=order_payload(lines))
+            batch = (await client.post("/api/orders/batch", json={
+                "orders": [order_payload(lines, idempotency_key="a")],
+            })).json()
+            return menu, refused, batch, await services.db.orders.count_documents({})
+
+    menu, refused, batch, stored = asyncio.run(run())
+    problems = [
+        "Unknown menu item 'not-on-the-menu'",
+        f"{menu[1]['name']} is not available",
+        f"Invalid quantity 0 for {menu[2]['name']}",
+    ]
+    assert (refused.status_code, refused.json()["detail"]) == (400, problems)
+    assert (batch[0]["status"], batch[0]["detail"]) == ("error", "; ".join(problems))
+    assert stored == 0
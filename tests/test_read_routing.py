@@ -0,0 +1,112 @@
+"""Reporting reads go to secondaries; order writes and lookups stay on the primary.
+
+The end-to-end test needs a replica set, e.g. a single-host one:
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+    MONGO_REPLICA_SET_URL='mongodb://localhost:27017/?replicaSet=rs0' pytest tests/test_read_routing.py
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')  # server.py builds an app at import
+os.environ.setdefault('DB_NAME', 'bakery_test')
+
+import httpx  # noqa: E402
+from pymongo import monitoring  # noqa: E402
+from pymongo.read_preferences import Primary, SecondaryPreferred  # noqa: E402
+
+from settings import Settings  # noqa: E402
+
+REPLICA_SET_URL = os.environ.get('MONGO_REPLICA_SET_URL', 'mongodb://localhost:27017/?replicaSet=rs0')
+
+
+def test_reporting_read_preference():
+    settings = Settings(mongo_url="mongodb://localhost", db_name="x")
+    assert settings.reporting_reads() == SecondaryPreferred(max_staleness=90)
+    primary = Settings(mongo_url="mongodb://localhost", db_name="x", reporting_read_preference="primary")
+    assert primary.reporting_reads() == Primary()
+    with pytest.raises(ValueError):
+        Settings(mongo_url="mongodb://localhost", db_name="x", reporting_read_preference="secondaryPrefered")
+    with pytest.raises(ValueError):
+        Settings(mongo_url="mongodb://localhost", db_name="x", reporting_max_staleness=30)
+
+
+def test_reporting_handle():
+    import server
+    import services
+
+    server.create_app(Settings(mongo_url="mongodb://localhost:27017", db_name="x", reporting_max_staleness=120))
+    assert services.db.read_preference == Primary()
+    assert services.reporting_db.read_preference == SecondaryPreferred(max_staleness=120)
+    assert services.reporting_db.name == services.db.name
+
+
+class ReadPreferences(monitoring.CommandListener):
+    """$readPreference sent with each command on the orders collection"""
+
+    def __init__(self):
+        self.reads = []
+
+    def started(self, event):
+        if event.command.get(event.command_name) == "orders":
+            self.reads.append((event.command_name, event.command.get("$readPreference", {}).get("mode", "primary")))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def replica_set_available():
+    from pymongo import MongoClient
+
+    client = MongoClient(REPLICA_SET_URL, serverSelectionTimeoutMS=1000)
+    try:
+        return "setName" in client.admin.command("hello")
+    except Exception:
+        return False
+    finally:
+        client.close()
+
+
+@pytest.mark.skipif(not replica_set_available(), reason=f"no replica set at {REPLICA_SET_URL}")
+def test_routing_on_replica_set():
+    import server
+    import services
+
+    listener = ReadPreferences()
+    monitoring.register(listener)  # applies to clients created from here on
+    db_name = f"bakery_routing_{uuid.uuid4().hex[:8]}"
+    app = server.create_app(Settings(mongo_url=REPLICA_SET_URL, db_name=db_name))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with server.lifespan(app), httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            menu = (await client.get("/api/menu")).json()
+            order = (await client.post("/api/orders", json={
+                "customer_name": "Ada",
+                "customer_email": "ada@example.test",
+                "customer_phone": "555-0100",
+                "items": [{**menu[0], "quantity": 1}],
+                "total_amount": 0,
+                "pickup_time": "2030-01-07T09:00",
+            })).json()
+
+            listener.reads.clear()
+            assert (await client.get(f"/api/orders/{order['id']}")).status_code == 200
+            assert listener.reads == [("find", "primary")]
+
+            listener.reads.clear()
+            assert (await client.get("/api/admin/orders")).status_code == 200
+            assert listener.reads == [("find", "secondaryPreferred")]
+
+            listener.reads.clear()
+            assert (await client.get("/api/admin/orders/export")).status_code == 200
+            assert ("find", "secondaryPreferred") in listener.reads
+            await services.client.drop_database(db_name)
+
+    asyncio.run(run())
@@ -0,0 +1,117 @@
+"""Closed revenue buckets are computed once; open and evicted ones are recomputed"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from revenue import RevenueSeries, bucket_ranges, bucket_starts  # noqa: E402
+
+START, END = datetime(2030, 1, 7, 9, 0), datetime(2030, 1, 7, 13, 0)
+
+
+class StubbedSeries(RevenueSeries):
+    """Revenue of one order per hour, worth the hour; records the ranges it aggregates"""
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self.aggregated = []
+        self.during_aggregate = None
+
+    async def _aggregate(self, unit, start, end):
+        self.aggregated.append((start.hour, end.hour))
+        if self.during_aggregate:
+            self.during_aggregate()
+        return {bucket: {"orders": 1, "revenue": float(bucket.hour)} for bucket in bucket_starts(unit, start, end)}
+
+
+def database():
+    return mongomock_motor.AsyncMongoMockClient()["revenue_test"]
+
+
+def at(hour, minute=0, second=0):
+    return datetime(2030, 1, 7, hour, minute, second)
+
+
+def test_only_open_buckets_are_recomputed():
+    async def run():
+        db = database()
+        revenue = StubbedSeries(db, grace=60)
+        first = await revenue.series("hour", START, END, now=at(12, 0, 30))
+        await revenue.series("hour", START, END, now=at(12, 0, 30))
+        # 11:00-12:00 closes a minute after it ends
+        await revenue.series("hour", START, END, now=at(12, 1))
+        await revenue.series("hour", START, END, now=at(12, 1))
+        # Another worker finds the closed buckets in the collection
+        other = StubbedSeries(db, grace=60)
+        await other.series("hour", START, END, now=at(12, 1))
+        stored = sorted([doc["_id"] async for doc in db.revenue_buckets.find()])
+        return first, revenue.aggregated, other.aggregated, stored
+
+    first, aggregated, other, stored = asyncio.run(run())
+    assert [(row["start"].hour, row["orders"], row["revenue"]) for row in first] == [
+        (9, 1, 9.0), (10, 1, 10.0), (11, 1, 11.0), (12, 1, 12.0),
+    ]
+    assert first[0]["end"] == at(10)
+    assert aggregated == [(9, 13), (11, 13), (11, 13), (12, 13)]
+    assert other == [(12, 13)]
+    assert stored == ["hour|2030-01-07T09:00", "hour|2030-01-07T10:00", "hour|2030-01-07T11:00"]
+
+
+def test_eviction_recomputes_the_buckets_of_cancelled_orders():
+    async def run():
+        db = database()
+        revenue = StubbedSeries(db, grace=60)
+        now = at(14)
+        await revenue.series("hour", START, END, now=now)
+        await revenue.series("day", START, END, now=now + timedelta(days=1))
+        await revenue.evict([at(10, 30)])
+        stored = sorted([doc["_id"] async for doc in db.revenue_buckets.find()])
+        revenue.aggregated.clear()
+        await revenue.series("hour", START, END, now=now)
+        return revenue.aggregated, stored
+
+    aggregated, stored = asyncio.run(run())
+    assert aggregated == [(10, 11)]
+    # The hour and the day bucket of the order are gone; the other hours stay
+    assert stored == ["hour|2030-01-07T09:00", "hour|2030-01-07T11:00", "hour|2030-01-07T12:00"]
+
+
+def test_results_overlapping_an_eviction_are_not_cached():
+    async def run():
+        db = database()
+        revenue = StubbedSeries(db, grace=60)
+        # A cancellation lands while the buckets are being aggregated
+        revenue.during_aggregate = lambda: revenue.forget([at(10, 30)])
+        await revenue.series("hour", START, END, now=at(14))
+        revenue.during_aggregate = None
+        stored = await db.revenue_buckets.count_documents({})
+        await revenue.series("hour", START, END, now=at(14))
+        await revenue.series("hour", START, END, now=at(14))
+        return stored, revenue.aggregated
+
+    stored, aggregated = asyncio.run(run())
+    assert stored == 0
+    assert aggregated == [(9, 13), (9, 13)]
+
+
+def test_an_old_missing_bucket_is_aggregated_apart_from_the_open_one():
+    async def run():
+        revenue = StubbedSeries(database(), grace=60)
+        await revenue.series("hour", START, END, now=at(12, 30))
+        await revenue.evict([at(9, 30)])
+        revenue.aggregated.clear()
+        series = await revenue.series("hour", START, END, now=at(12, 30))
+        return revenue.aggregated, series
+
+    aggregated, series = asyncio.run(run())
+    # 10:00 and 11:00 stay cached
+    assert sorted(aggregated) == [(9, 10), (12, 13)]
+    assert [row["revenue"] for row in series] == [9.0, 10.0, 11.0, 12.0]
+
+
+def test_bucket_ranges():
+    hour = timedelta(hours=1)
+    assert bucket_ranges([], hour) == []
+    assert bucket_ranges([at(9), at(10), at(12)], hour) == [(at(9), at(11)), (at(12), at(13))]
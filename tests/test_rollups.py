@@ -0,0 +1,68 @@
+"""Sales rollups are only maintained once they have been built"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from rollups import SalesRollups  # noqa: E402
+
+
+def order(total, name="Croissant", quantity=1, status="pending"):
+    return {
+        "order_date": datetime(2030, 1, 7, 9, 0),
+        "total_amount": total,
+        "items": [{"name": name, "price": total / quantity, "quantity": quantity}],
+        "status": status,
+    }
+
+
+def test_existing_orders_are_not_shadowed_by_new_ones():
+    async def run():
+        db = mongomock_motor.AsyncMongoMockClient()["rollups_test"]
+        await db.orders.insert_many([order(7.0), order(7.0), order(7.0)])
+        rollups = SalesRollups(db)
+        assert await rollups.initialize(db.orders) is False
+
+        new = order(3.5)
+        await db.orders.insert_one(dict(new))
+        await rollups.record_many([new])
+        # Still unbuilt, so analytics keep scanning the orders
+        assert await rollups.totals() is None
+        assert await rollups.snapshot(datetime(2030, 1, 7)) == (None, None)
+
+        assert await rollups.rebuild(db.orders) == 4
+        await rollups.record_many([order(1.5)])
+        return await rollups.totals()
+
+    totals = asyncio.run(run())
+    assert (totals["orders"], totals["revenue"]) == (5, 26.0)
+
+
+def test_fresh_database_counts_from_the_first_order():
+    async def run():
+        db = mongomock_motor.AsyncMongoMockClient()["rollups_test"]
+        rollups = SalesRollups(db)
+        assert await rollups.initialize(db.orders) is True
+        await rollups.record_many([order(4.0, quantity=2), order(2.0)])
+        await rollups.record_many([order(2.0)], sign=-1)
+        return await rollups.totals(), await rollups.popular_items()
+
+    totals, popular = asyncio.run(run())
+    assert (totals["orders"], totals["revenue"], totals["quantity"]) == (1, 4.0, 2)
+    assert [(item["name"], item["quantity"]) for item in popular] == [("Croissant", 2)]
+
+
+def test_another_processes_rebuild_is_picked_up():
+    async def run():
+        db = mongomock_motor.AsyncMongoMockClient()["rollups_test"]
+        await db.orders.insert_one(order(7.0))
+        worker = SalesRollups(db)
+        await worker.record_many([order(1.0)])
+        await SalesRollups(db).rebuild(db.orders)  # e.g. manage.py rebuild-rollups
+        await worker.record_many([order(1.0)])
+        return await worker.totals()
+
+    totals = asyncio.run(run())
+    assert (totals["orders"], totals["revenue"]) == (2, 8.0)